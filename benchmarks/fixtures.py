@@ -0,0 +1,121 @@
+"""
+Synthetic audio fixtures for the benchmark suite.
+
+Every fixture is generated with NumPy (no downloads) and comes with the
+ground-truth speech intervals, so VAD output can be scored as well as timed.
+"""
+import subprocess
+import wave
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def tone(duration: float, freq: float = 440.0, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def noise(duration: float, amplitude: float = 0.05, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (amplitude * rng.standard_normal(int(duration * SAMPLE_RATE))).astype(np.float32)
+
+
+def speech_like(duration: float, seed: int = 0) -> np.ndarray:
+    """
+    Voiced-speech stand-in: a harmonic series on a wandering pitch,
+    amplitude-modulated at a syllable rate (~4 Hz), plus a little breath noise.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, np.pi))
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = 0.5 * (1 + np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, np.pi)))
+    signal = voiced * (0.2 + 0.8 * syllables) + 0.02 * rng.standard_normal(n)
+    return (0.2 * signal / np.max(np.abs(signal))).astype(np.float32)
+
+
+def bursts(
+    pattern: List[Tuple[float, float]],
+    noise_floor: float = 0.003,
+    seed: int = 0
+) -> Tuple[np.ndarray, List[Dict[str, float]]]:
+    """
+    Builds a signal from (silence, speech) duration pairs over a low noise
+    floor. Returns the audio and the ground-truth speech intervals.
+    """
+    parts = []
+    intervals = []
+    position = 0.0
+    for i, (gap, speech) in enumerate(pattern):
+        parts.append(noise(gap, noise_floor, seed + 2 * i))
+        position += gap
+        parts.append(speech_like(speech, seed + 2 * i + 1) + noise(speech, noise_floor, seed + 2 * i + 1))
+        intervals.append({"start": position, "end": position + speech})
+        position += speech
+    parts.append(noise(1.0, noise_floor, seed + 2 * len(pattern)))
+    return np.concatenate(parts), intervals
+
+
+def write_wav(path: Path, audio: np.ndarray):
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def encode(wav_path: Path, out_path: Path):
+    """
+    Re-encodes a WAV fixture with ffmpeg (e.g. to .m4a/.mkv) so the decode
+    stage is exercised on a compressed container.
+    """
+    subprocess.run(
+        ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", str(wav_path), str(out_path)],
+        check=True
+    )
+
+
+def build_fixtures(out_dir: Path, long_minutes: float = 5.0) -> List[Dict]:
+    """
+    Writes the standard fixture set to out_dir and returns their metadata:
+    name, path, duration and ground-truth speech intervals.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(42)
+
+    specs = {
+        "tone": (tone(20.0), []),
+        "noise": (noise(20.0, 0.1), []),
+        "dialogue": bursts([(0.6, 1.2), (0.3, 0.8), (1.5, 2.5), (0.4, 0.6), (2.0, 4.0)] * 4, seed=1),
+        "lecture": bursts([(0.8, 12.0), (0.5, 25.0), (1.0, 40.0)], seed=2),
+    }
+    n_bursts = int(long_minutes * 60 / 5)
+    specs["long"] = bursts(
+        [(float(rng.uniform(0.3, 3.0)), float(rng.uniform(0.5, 6.0))) for _ in range(n_bursts)],
+        seed=3
+    )
+
+    fixtures = []
+    for name, (audio, intervals) in specs.items():
+        path = out_dir / f"{name}.wav"
+        write_wav(path, audio)
+        fixtures.append({
+            "name": name,
+            "path": str(path),
+            "duration": len(audio) / SAMPLE_RATE,
+            "speech": intervals,
+        })
+
+    # Same dialogue in a compressed container to time a real decode
+    dialogue = next(f for f in fixtures if f["name"] == "dialogue")
+    m4a_path = out_dir / "dialogue.m4a"
+    encode(Path(dialogue["path"]), m4a_path)
+    fixtures.append(dict(dialogue, name="dialogue_m4a", path=str(m4a_path)))
+    return fixtures
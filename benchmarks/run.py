@@ -0,0 +1,347 @@
+"""
+Offline CPU benchmark for the transcription pipeline.
+
+Runs synthetic fixtures through the CLI's code path (prepare_audio, then
+process_file), times each stage (decode, VAD, per-segment transcription,
+write_srt) from its events and prints a JSON report with real-time
+factors, segments/sec and per-fixture peak RSS, so runs can be compared
+across commits. Models are never downloaded unless --no-offline is given.
+
+    python -m benchmarks.run --model stub --out bench.json
+    python -m benchmarks.run --model tiny --batch-size 8
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from src.memory import MB, MemoryTracker
+
+from .fixtures import build_fixtures
+
+SAMPLE_RATE = 16000
+
+
+class StubModel:
+    """
+    Stands in for a Whisper model so the pipeline overhead can be measured
+    without downloading checkpoints.
+    """
+
+    def transcribe(self, audio, **options):
+        duration = len(audio) / SAMPLE_RATE
+        return {
+            "text": " stub",
+            "segments": [{"start": 0.0, "end": duration, "text": " stub"}],
+        }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def speech_agreement(predicted: List[Dict], truth: List[Dict], duration: float) -> Dict[str, float]:
+    """
+    Frame-level (10 ms) precision/recall/F1 of predicted speech against the
+    fixture's ground truth.
+    """
+    n = int(duration * 100) + 1
+
+    def mask(intervals):
+        m = np.zeros(n, dtype=bool)
+        for seg in intervals:
+            m[int(seg["start"] * 100):int(seg["end"] * 100)] = True
+        return m
+
+    p, t = mask(predicted), mask(truth)
+    tp = np.sum(p & t)
+    precision = tp / p.sum() if p.sum() else float(not t.sum())
+    recall = tp / t.sum() if t.sum() else float(not p.sum())
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": round(float(precision), 4),
+        "recall": round(float(recall), 4),
+        "f1": round(float(f1), 4),
+    }
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Word-level edit distance divided by the reference length.
+    """
+    ref, hyp = reference.split(), hypothesis.split()
+    if not ref:
+        return float(bool(hyp))
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1] / len(ref)
+
+
+def transcribe_fixture(fixture: Dict, model, batch_size: int):
+    """
+    Transcribes a fixture's ground-truth segments. Returns (seconds, text).
+    """
+    from src.audio import load_audio
+    from src.transcriber import _clip_text, _transcribe_clips
+
+    audio = load_audio(fixture["path"])
+    options = {"language": "en", "task": "transcribe", "fp16": False}
+    clips = [
+        audio[int(seg["start"] * SAMPLE_RATE):int(seg["end"] * SAMPLE_RATE)]
+        for seg in fixture["speech"]
+    ]
+    texts = []
+    start = time.perf_counter()
+    for i in range(0, len(clips), batch_size):
+        texts.extend(_clip_text(r) for r in _transcribe_clips(model, clips[i:i + batch_size], options))
+    return time.perf_counter() - start, " ".join(t for t in texts if t)
+
+
+def compare_quantize(fixtures: List[Dict], args) -> Dict:
+    """
+    Speed and transcript deltas of the int8 model against fp32 on the same
+    segments (the fp32 transcript is the reference for WER).
+    """
+    from src.models import load_whisper_model
+
+    fp32 = load_whisper_model(args.model, device="cpu", precision="fp32", offline=args.offline)
+    start = time.perf_counter()
+    int8 = load_whisper_model(args.model, device="cpu", precision="int8", offline=args.offline)
+    quantize_seconds = time.perf_counter() - start
+
+    results = []
+    for fixture in fixtures:
+        if not fixture["speech"]:
+            continue
+        fp32_seconds, fp32_text = transcribe_fixture(fixture, fp32, args.batch_size)
+        int8_seconds, int8_text = transcribe_fixture(fixture, int8, args.batch_size)
+        results.append({
+            "name": fixture["name"],
+            "fp32_seconds": round(fp32_seconds, 4),
+            "int8_seconds": round(int8_seconds, 4),
+            "speedup": round(fp32_seconds / int8_seconds, 3) if int8_seconds else None,
+            "int8_wer_vs_fp32": round(word_error_rate(fp32_text, int8_text), 4),
+        })
+    return {
+        "load_and_quantize_seconds": round(quantize_seconds, 3),
+        "fixtures": results,
+    }
+
+
+def run_vad(name: str, audio: np.ndarray, fixture: Dict, offline: bool = False) -> List[Dict]:
+    if name == "truth":
+        return fixture["speech"]
+    if name == "energy":
+        from src.energy_vad import get_speech_timestamps
+        return get_speech_timestamps(audio)
+    from src.vad import get_speech_timestamps
+    return get_speech_timestamps(audio, offline=offline)
+
+
+def compare_vad(fixtures: List[Dict], args) -> Dict:
+    """
+    Speed (real-time factor) and speech agreement of the energy VAD against
+    Silero on every fixture; both are also scored against the ground truth.
+    """
+    from src.audio import load_audio
+
+    results = []
+    for fixture in fixtures:
+        audio = load_audio(fixture["path"])
+        duration = fixture["duration"]
+        timings, found = {}, {}
+        for name in ("silero", "energy"):
+            start = time.perf_counter()
+            found[name] = run_vad(name, audio, fixture, args.offline)
+            timings[name] = time.perf_counter() - start
+        results.append({
+            "name": fixture["name"],
+            "silero_rtf": round(timings["silero"] / duration, 5),
+            "energy_rtf": round(timings["energy"] / duration, 5),
+            "speedup": round(timings["silero"] / timings["energy"], 1) if timings["energy"] else None,
+            "energy_vs_silero": speech_agreement(found["energy"], found["silero"], duration),
+            "silero_vs_truth": speech_agreement(found["silero"], fixture["speech"], duration),
+            "energy_vs_truth": speech_agreement(found["energy"], fixture["speech"], duration),
+        })
+    return {"fixtures": results}
+
+
+def bench_fixture(fixture: Dict, args, out_dir: Path, tracker) -> Dict:
+    """
+    Runs a fixture through the same entry points as the CLI's prefetch
+    path (prepare_audio, then process_file) and reports the stage timings
+    from their events. Peak RSS is the highest sample while this fixture ran.
+    """
+    from src.audio import load_audio
+    from src.main import process_file
+    from src.progress import ProgressBus
+    from src.transcriber import prepare_audio
+
+    duration = fixture["duration"]
+    events: List[Dict] = []
+    tracker.take_peak()
+    start = time.perf_counter()
+
+    if args.vad == "truth":
+        t0 = time.perf_counter()
+        audio = load_audio(fixture["path"])
+        events.append({"event": "stage", "stage": "decode", "seconds": time.perf_counter() - t0})
+        prepared = {"audio": audio, "timestamps": fixture["speech"]}
+    else:
+        prepared = prepare_audio(
+            fixture["path"], vad=args.vad, offline=args.offline, event_callback=events.append
+        )
+    timestamps = prepared["timestamps"]
+
+    process_file(
+        Path(fixture["path"]), out_dir,
+        event_callback=events.append,
+        prepared=prepared,
+        # No progress bar in the report output
+        progress=ProgressBus(),
+        output_language="en",
+        source_language="en",
+        use_vad=True,
+        # Ground-truth timestamps come in through `prepared`
+        vad="silero" if args.vad == "truth" else args.vad,
+        model_size=args.model,
+        batch_size=1 if args.model == "stub" else args.batch_size,
+        quantize=args.quantize,
+        offline=args.offline,
+    )
+    total = time.perf_counter() - start
+    prepared = None
+
+    # Whisper segments are reported as "transcribe"
+    names = {"segment": "transcribe"}
+    stages: Dict[str, float] = {}
+    segment_seconds = []
+    for event in events:
+        if event.get("event") != "stage" or event["stage"] == "model_load":
+            continue
+        name = names.get(event["stage"], event["stage"])
+        stages[name] = stages.get(name, 0.0) + event["seconds"]
+        if event["stage"] == "segment":
+            segment_seconds.append(event["seconds"])
+
+    report = {
+        "name": fixture["name"],
+        "audio_seconds": round(duration, 3),
+        "segments": len(timestamps),
+        "stages": {k: round(v, 4) for k, v in stages.items()},
+        "rtf": {k: round(v / duration, 5) for k, v in stages.items()},
+        "total_seconds": round(total, 4),
+        "total_rtf": round(total / duration, 5),
+        "segments_per_sec": round(len(timestamps) / stages["transcribe"], 2) if stages.get("transcribe") else None,
+        "peak_rss_mb": round(tracker.take_peak() / MB, 1),
+    }
+    if segment_seconds:
+        report["segment_seconds"] = {
+            "mean": round(float(np.mean(segment_seconds)), 4),
+            "p95": round(float(np.percentile(segment_seconds, 95)), 4),
+            "max": round(float(np.max(segment_seconds)), 4),
+        }
+    if args.vad != "truth":
+        report["vad_agreement"] = speech_agreement(timestamps, fixture["speech"], duration)
+    return report
+
+
+def load_model(args):
+    """
+    Loads the model into the process-wide registry, where process_file
+    picks it up; the stub is registered under the name "stub".
+    """
+    from src.transcriber import load_model as load_registered
+    if args.model == "stub":
+        from src.models import default_precision, get_device, get_registry
+        device = get_device()
+        get_registry().get(("whisper", "stub", device, default_precision(device)), StubModel)
+    load_registered(args.model, args.quantize, args.offline)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="stub", help="'stub' or a Whisper model size (e.g. tiny).")
+    parser.add_argument("--vad", choices=["silero", "energy", "truth"], default="silero",
+                        help="Run Silero or the energy VAD, or use the fixtures' ground-truth segments.")
+    parser.add_argument("--compare-vad", action="store_true",
+                        help="Also report energy VAD vs Silero speed and agreement.")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--long-minutes", type=float, default=5.0,
+                        help="Duration of the long fixture.")
+    parser.add_argument("--fixtures", nargs="*", help="Only run these fixture names.")
+    parser.add_argument("--fixtures-dir", type=Path, help="Where to write fixtures (default: temp dir).")
+    parser.add_argument("--quantize", choices=["int8"], help="Benchmark a quantized model.")
+    parser.add_argument("--compare-quantize", action="store_true",
+                        help="Also report int8 vs fp32 speed and transcript WER (needs a real model).")
+    parser.add_argument("--threads", type=int, help="torch intra-op threads (default: torch's choice).")
+    parser.add_argument("--offline", action=argparse.BooleanOptionalAction, default=True,
+                        help="Never download models (default); --no-offline allows downloads.")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    import torch
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures_dir = args.fixtures_dir or Path(tmp) / "fixtures"
+        out_dir = Path(tmp) / "out"
+        out_dir.mkdir()
+        fixtures = build_fixtures(fixtures_dir, args.long_minutes)
+        if args.fixtures:
+            fixtures = [f for f in fixtures if f["name"] in args.fixtures]
+
+        tracker = MemoryTracker().start()
+        start = time.perf_counter()
+        load_model(args)
+        model_load = time.perf_counter() - start
+
+        results = [bench_fixture(f, args, out_dir, tracker) for f in fixtures]
+        comparison = None
+        if args.compare_quantize and args.model != "stub":
+            comparison = compare_quantize(fixtures, args)
+        vad_comparison = compare_vad(fixtures, args) if args.compare_vad else None
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "torch_threads": torch.get_num_threads(),
+        "model": args.model,
+        "quantize": args.quantize,
+        "vad": args.vad,
+        "batch_size": args.batch_size,
+        "model_load_seconds": round(model_load, 3),
+        "fixtures": results,
+        "peak_rss_mb": round(tracker.peak / MB, 1),
+    }
+    if comparison:
+        report["quantize_comparison"] = comparison
+    if vad_comparison:
+        report["vad_comparison"] = vad_comparison
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
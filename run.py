@@ -17,8 +17,8 @@ if __name__ == "__main__":
             from src.gui import main
             main()
         else:
-            from src.main import app
-            app()
+            from src.main import cli
+            cli()
         sys.exit(0)
 
     # 2. If running as a script, try to auto-detect .venv relative to this script
@@ -45,8 +45,8 @@ if __name__ == "__main__":
             from src.gui import main
             main()
         else:
-            from src.main import app
-            app()
+            from src.main import cli
+            cli()
     except ImportError as e:
         print("\n❌ Error: Application dependencies are missing.")
         
@@ -0,0 +1,94 @@
+import logging
+import numpy as np
+from typing import Sequence
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def load_audio(path: str, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes a media file once into a mono float32 buffer at `sr` Hz.
+    The same buffer is shared by the VAD and the transcriber.
+    """
+    import whisper
+    logger.info(f"Decoding audio from {path}...")
+    audio = whisper.load_audio(path, sr=sr)
+    logger.info(f"Decoded {len(audio) / sr:.1f}s of audio.")
+    return audio
+
+
+def probe_duration(path: str) -> float:
+    """
+    Returns the duration of a media file in seconds using ffprobe,
+    or 0.0 if it cannot be determined.
+    """
+    import subprocess
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True, text=True).stdout
+        return float(out.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        logger.warning(f"Could not probe duration of {path}")
+        return 0.0
+
+
+def iter_pcm_chunks(stream, chunk_seconds: float = 1.0, sr: int = SAMPLE_RATE):
+    """
+    Reads mono s16le PCM at `sr` Hz from a binary stream (a pipe, stdin,
+    a socket file...) and yields float32 chunks of `chunk_seconds`.
+    The last chunk may be shorter.
+    """
+    chunk_bytes = int(chunk_seconds * sr) * 2
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        # Drop a trailing odd byte; s16le samples are 2 bytes wide
+        data = data[:len(data) - len(data) % 2]
+        yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+
+def iter_audio_chunks(
+    path: str,
+    chunk_seconds: float = 1.0,
+    sr: int = SAMPLE_RATE,
+    input_args: Sequence[str] = ()
+):
+    """
+    Streams a media file through ffmpeg and yields mono float32 chunks of
+    `chunk_seconds` at `sr` Hz, so the whole file is never held in memory.
+    The last chunk may be shorter. `path` can be anything ffmpeg reads
+    ("-" for stdin, a named pipe, an rtsp:// URL...); `input_args` are
+    ffmpeg input options such as ["-f", "s16le", "-ar", "48000"].
+    """
+    import subprocess
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        *input_args,
+        "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "-loglevel", "error",
+        "-"
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+    try:
+        yield from iter_pcm_chunks(process.stdout, chunk_seconds, sr)
+        finished = True
+    finally:
+        if not finished:
+            # Consumer stopped early; don't wait for ffmpeg to drain
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read().decode(errors="replace")
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"Failed to stream audio: {stderr.strip()}")
@@ -0,0 +1,166 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Thresholds used by whisper.transcribe() to decide on temperature fallback
+# and on skipping silent windows. Kept identical so batched and sequential
+# decoding agree.
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def split_segments(
+    tokens: List[int],
+    tokenizer,
+    duration: float,
+    time_offset: float = 0.0
+) -> List[Dict[str, Any]]:
+    """
+    Splits decoded tokens into timestamped segments the same way
+    whisper.transcribe() does for a single 30s window.
+    Returns a list of dicts with 'start', 'end', 'text' and 'tokens' keys.
+    """
+    from whisper.audio import HOP_LENGTH, SAMPLE_RATE
+    time_precision = 2 * HOP_LENGTH / SAMPLE_RATE
+    timestamp_begin = tokenizer.timestamp_begin
+
+    is_ts = [t >= timestamp_begin for t in tokens]
+    single_timestamp_ending = is_ts[-2:] == [False, True]
+    consecutive = [
+        i + 1 for i in range(len(is_ts) - 1) if is_ts[i] and is_ts[i + 1]
+    ]
+
+    segments = []
+    if consecutive:
+        slices = list(consecutive)
+        if single_timestamp_ending:
+            slices.append(len(tokens))
+        last_slice = 0
+        for current_slice in slices:
+            sliced = tokens[last_slice:current_slice]
+            start_pos = sliced[0] - timestamp_begin
+            end_pos = sliced[-1] - timestamp_begin
+            segments.append({
+                "start": time_offset + start_pos * time_precision,
+                "end": time_offset + end_pos * time_precision,
+                "text": tokenizer.decode(sliced),
+                "tokens": list(sliced),
+            })
+            last_slice = current_slice
+    else:
+        timestamps = [t for t, ts in zip(tokens, is_ts) if ts]
+        if timestamps and timestamps[-1] != timestamp_begin:
+            duration = (timestamps[-1] - timestamp_begin) * time_precision
+        segments.append({
+            "start": time_offset,
+            "end": time_offset + duration,
+            "text": tokenizer.decode(tokens),
+            "tokens": list(tokens),
+        })
+
+    # whisper.transcribe() clears instantaneous or empty segments
+    return [
+        s for s in segments
+        if s["start"] != s["end"] and s["text"].strip()
+    ]
+
+
+def needs_multiple_windows(tokens: List[int], timestamp_begin: int) -> bool:
+    """
+    True when whisper.transcribe() would seek to a second window for this
+    output, i.e. the decoder stopped at a timestamp pair before the end.
+    """
+    is_ts = [t >= timestamp_begin for t in tokens]
+    single_timestamp_ending = is_ts[-2:] == [False, True]
+    consecutive = any(a and b for a, b in zip(is_ts[:-1], is_ts[1:]))
+    return consecutive and not single_timestamp_ending
+
+
+def decode_batch(
+    model,
+    segments: List[np.ndarray],
+    task: str,
+    language: Optional[str],
+    high_quality: bool = False,
+    fp16: bool = False
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Runs the encoder and decoder over a batch of audio segments at once.
+
+    Returns one entry per input: a list of segment dicts (times relative to
+    the start of that input), or None when the result would differ from
+    whisper.transcribe() (segment longer than 30s, temperature fallback
+    required, or multiple windows needed). Callers should transcribe those
+    inputs sequentially.
+    """
+    import torch
+    import whisper
+    from whisper.audio import (
+        N_FRAMES, N_SAMPLES, SAMPLE_RATE, log_mel_spectrogram, pad_or_trim
+    )
+    from whisper.tokenizer import get_tokenizer
+
+    if language is None and not model.is_multilingual:
+        language = "en"
+
+    dtype = torch.float16 if fp16 else torch.float32
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(segments)
+
+    indices = []
+    mels = []
+    for i, audio in enumerate(segments):
+        if len(audio) > N_SAMPLES:
+            continue
+        # Log-mel is computed per segment: the normalisation in
+        # log_mel_spectrogram uses the global max of its input.
+        mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+        content_frames = mel.shape[-1] - N_FRAMES
+        mels.append(pad_or_trim(mel[:, :content_frames], N_FRAMES))
+        indices.append(i)
+
+    if not mels:
+        return results
+
+    batch = torch.stack(mels).to(model.device).to(dtype)
+    options = whisper.DecodingOptions(
+        task=task,
+        language=language,
+        temperature=0.0,
+        beam_size=5 if high_quality else None,
+        fp16=fp16,
+    )
+    decoded = whisper.decode(model, batch, options)
+
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task=task,
+    )
+
+    for i, result in zip(indices, decoded):
+        no_speech = result.no_speech_prob > NO_SPEECH_THRESHOLD
+        # High quality mode passes a single temperature, so there is no
+        # fallback to match.
+        if not high_quality and not no_speech and (
+            result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or result.avg_logprob < LOGPROB_THRESHOLD
+        ):
+            continue
+        if no_speech and result.avg_logprob < LOGPROB_THRESHOLD:
+            results[i] = []
+            continue
+        if needs_multiple_windows(result.tokens, tokenizer.timestamp_begin):
+            continue
+
+        duration = len(segments[i]) / SAMPLE_RATE
+        results[i] = split_segments(result.tokens, tokenizer, duration)
+
+    fallback = sum(1 for i in indices if results[i] is None)
+    if fallback:
+        logger.debug(f"{fallback}/{len(segments)} segments need sequential decoding")
+    return results
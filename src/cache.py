@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+) / "translation-tool"
+
+# Bump when the stored segment format or transcription logic changes in a
+# way that makes old entries invalid
+CACHE_VERSION = 1
+
+# transcribe_video options that don't change the resulting segments.
+# "stream" and "stream_window" are deliberately not neutral: streaming VAD
+# and its window cut speech into different segments than whole-file VAD,
+# so the subtitles differ, even when --max-memory chose streaming.
+NEUTRAL_OPTIONS = {"batch_size", "offline", "progress"}
+
+# Options that only matter while another option is on, e.g. --max-memory
+# rewrites stream_window even for files that are not streamed
+CONDITIONAL_OPTIONS = {
+    "stream_window": "stream",
+    "max_gap": "coalesce",
+    "segment_padding": "coalesce",
+    "max_window": "coalesce",
+}
+
+
+def relevant_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The options that can change the transcription: neither neutral nor
+    inactive (see CONDITIONAL_OPTIONS).
+    """
+    return {
+        k: v for k, v in options.items()
+        if k not in NEUTRAL_OPTIONS
+        and (k not in CONDITIONAL_OPTIONS or options.get(CONDITIONAL_OPTIONS[k]))
+    }
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path: Path, data: Any):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _touch(path: Path):
+    # mtime is the LRU order
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class TranscriptCache:
+    """
+    Persistent, content-addressed store of transcription results.
+
+    Entries are keyed by the SHA-256 of the media content plus every option
+    that affects the transcription, so renamed or copied files still hit and
+    output-only settings (output directory, formats) reuse the same entry.
+    Content hashes are memoized by (path, size, mtime) so unchanged files
+    are not re-read; each path has its own memo file, so concurrent worker
+    processes never rewrite a shared index. The total size of entries and
+    memos is capped with LRU eviction, and memos of deleted or changed
+    files are pruned.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_size_mb: float = 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_mb = max_size_mb
+        self.entries_dir = self.cache_dir / "entries"
+        self.hashes_dir = self.cache_dir / "file_hashes"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.hashes_dir.mkdir(parents=True, exist_ok=True)
+
+    def content_hash(self, path: Path) -> str:
+        path = Path(path).resolve()
+        stat = path.stat()
+        memo_path = self.hashes_dir / (hashlib.sha256(str(path).encode("utf-8")).hexdigest() + ".json")
+        try:
+            with open(memo_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                _touch(memo_path)
+                return entry["hash"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        digest = hash_file(path)
+        _write_json_atomic(memo_path, {
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": digest
+        })
+        return digest
+
+    def key_for(self, path: Path, options: Dict[str, Any]) -> str:
+        relevant = relevant_options(options)
+        payload = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "content": self.content_hash(path),
+                "options": relevant
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry_path = self.entries_dir / f"{key}.json"
+        try:
+            with open(entry_path, encoding="utf-8") as f:
+                segments = json.load(f)
+        except (OSError, ValueError):
+            return None
+        _touch(entry_path)
+        return segments
+
+    def put(self, key: str, subtitles: List[Dict[str, Any]]):
+        segments = [
+            {"start": s["start"], "end": s["end"], "text": s["text"]}
+            for s in subtitles
+        ]
+        _write_json_atomic(self.entries_dir / f"{key}.json", segments)
+        self._evict()
+
+    def _prune_memos(self) -> List[Path]:
+        """
+        Deletes memos whose file is gone or has changed since it was
+        hashed, and returns the others.
+        """
+        memos = []
+        for memo_path in self.hashes_dir.glob("*.json"):
+            try:
+                with open(memo_path, encoding="utf-8") as f:
+                    memo = json.load(f)
+                stat = Path(memo["path"]).stat()
+                if stat.st_size == memo["size"] and stat.st_mtime_ns == memo["mtime_ns"]:
+                    memos.append(memo_path)
+                    continue
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+            try:
+                memo_path.unlink()
+            except OSError:
+                pass
+        return memos
+
+    def _evict(self):
+        entries = []
+        total = 0
+        # A memo costs little to lose (one re-hash), but counts all the same
+        for entry in list(self.entries_dir.glob("*.json")) + self._prune_memos():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        budget = self.max_size_mb * 1024 ** 2
+        for _, size, entry in sorted(entries):
+            if total <= budget:
+                break
+            try:
+                entry.unlink()
+                total -= size
+                logger.debug(f"Evicted cache entry {entry.name}")
+            except OSError:
+                pass
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .audio import probe_duration
+from .cache import hash_file
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+MEDIA_EXTENSIONS = {
+    ".mp4", ".mkv", ".avi", ".mov", ".mp3", ".wav", ".flac", ".m4a"
+}
+
+
+def iter_media_files(root: Path, recursive: bool = False) -> Iterator[Path]:
+    """
+    Yields media files under `root` using os.scandir, which reuses the
+    directory listing's file type instead of a stat() per entry.
+    Directory symlinks are not followed, so link cycles can't recurse.
+    """
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in MEDIA_EXTENSIONS:
+                            yield Path(entry.path)
+                    except OSError as e:
+                        logger.warning(f"Skipping {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"Cannot read directory {directory}: {e}")
+
+
+def probe_durations(files: Sequence[Path], workers: int = 8) -> Dict[Path, float]:
+    """
+    Runs ffprobe on `files` from a thread pool (ffprobe is a subprocess,
+    so threads overlap fine). Unreadable files get 0.0.
+    """
+    if not files:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as pool:
+        return dict(zip(files, pool.map(lambda f: probe_duration(str(f)), files)))
+
+
+def find_duplicates(files: Sequence[Path], sizes: Dict[Path, int], workers: int = 8) -> Dict[Path, str]:
+    """
+    Returns the SHA-256 of every file that shares its size with another
+    one; files with a unique size can't have a duplicate and are not read.
+    """
+    by_size: Dict[int, List[Path]] = {}
+    for f in files:
+        by_size.setdefault(sizes[f], []).append(f)
+    candidates = [f for group in by_size.values() if len(group) > 1 for f in group]
+    if not candidates:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(candidates)))) as pool:
+        return dict(zip(candidates, pool.map(hash_file, candidates)))
+
+
+def build_manifest(
+    inputs: Iterable[Path],
+    recursive: bool = False,
+    workers: int = 8,
+    dedupe: bool = True
+) -> Dict[str, Any]:
+    """
+    Discovers media files in `inputs` (files or directories), probes their
+    durations in parallel and, with `dedupe`, folds files with identical
+    content into one entry. Entries are ordered largest first:
+    {'path', 'size', 'duration', 'sha256', 'duplicates'}.
+    """
+    start = time.perf_counter()
+    inputs = [Path(p) for p in inputs]
+    files: List[Path] = []
+    for path in inputs:
+        if path.is_dir():
+            files.extend(iter_media_files(path, recursive))
+        elif path.is_file():
+            files.append(path)
+        else:
+            logger.warning(f"Input path {path} does not exist.")
+    files = sorted({f.resolve() for f in files})
+
+    sizes = {}
+    for f in files:
+        try:
+            sizes[f] = f.stat().st_size
+        except OSError as e:
+            logger.warning(f"Skipping {f}: {e}")
+    files = [f for f in files if f in sizes]
+
+    hashes = find_duplicates(files, sizes, workers) if dedupe else {}
+    entries: List[Dict[str, Any]] = []
+    by_hash: Dict[str, Dict[str, Any]] = {}
+    for f in files:
+        digest = hashes.get(f)
+        if digest is not None and digest in by_hash:
+            by_hash[digest]["duplicates"].append(str(f))
+            continue
+        entry = {"path": str(f), "size": sizes[f], "sha256": digest, "duplicates": []}
+        entries.append(entry)
+        if digest is not None:
+            by_hash[digest] = entry
+
+    durations = probe_durations([Path(e["path"]) for e in entries], workers)
+    for entry in entries:
+        entry["duration"] = round(durations[Path(entry["path"])], 3)
+    entries.sort(key=lambda e: (-e["duration"], -e["size"], e["path"]))
+
+    duplicates = sum(len(e["duplicates"]) for e in entries)
+    logger.info(
+        f"Discovered {len(entries)} files ({sum(e['duration'] for e in entries) / 3600:.1f}h of media"
+        f"{f', {duplicates} duplicates skipped' if duplicates else ''}) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return {
+        "version": MANIFEST_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "inputs": [str(p.resolve()) for p in inputs],
+        "recursive": recursive,
+        "files": entries,
+    }
+
+
+def write_manifest(manifest: Dict[str, Any], path: Path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+    logger.info(f"Wrote manifest of {len(manifest['files'])} files to {path}")
+
+
+def load_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Returns the manifest stored at `path`, or None if it isn't one.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def expand_duplicates(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Lists every duplicate of a deduplicated manifest as an entry of its
+    own, right after the file it copies, so each path gets its subtitles.
+    With the transcription cache on, the copies are served from the
+    first one's cached segments instead of being transcribed again.
+    """
+    expanded = []
+    for entry in entries:
+        expanded.append(entry)
+        for path in entry.get("duplicates") or []:
+            expanded.append({**entry, "path": path, "duplicates": []})
+    return expanded
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parses "i/n" (1-based) into (i, n).
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"expected i/n, got {value!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard index must be between 1 and {max(count, 1)}")
+    return index, count
+
+
+def shard_entries(entries: List[Dict[str, Any]], index: int, count: int) -> List[Dict[str, Any]]:
+    """
+    Splits manifest entries into `count` shards of about equal total
+    duration (largest first, each to the least loaded shard) and returns
+    shard `index` (1-based), still largest first. The split depends only
+    on the manifest, so every node computes the same one.
+    """
+    loads = [0.0] * count
+    shards: List[List[Dict[str, Any]]] = [[] for _ in range(count)]
+    for entry in sorted(entries, key=lambda e: (-e["duration"], -e["size"], e["path"])):
+        target = loads.index(min(loads))
+        shards[target].append(entry)
+        # Unprobeable files still cost something
+        loads[target] += entry["duration"] or 1.0
+    return shards[index - 1]
@@ -0,0 +1,131 @@
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+
+# Frames per feature block: bounds the temporary frame/FFT arrays
+# (~4096 x 400 floats) regardless of the input length
+BLOCK_FRAMES = 4096
+
+
+def frame_features(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    frame_seconds: float = FRAME_SECONDS,
+    hop_seconds: float = HOP_SECONDS
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns per-frame (energy in dBFS, zero-crossing rate, spectral
+    flatness) for overlapping frames of `audio`. Frames are strided views
+    of the buffer, processed in fixed-size blocks.
+    """
+    frame = int(frame_seconds * sr)
+    hop = int(hop_seconds * sr)
+    if len(audio) < frame:
+        audio = np.pad(audio, (0, frame - len(audio)))
+    frames = sliding_window_view(audio, frame)[::hop]
+    n = len(frames)
+    window = np.hanning(frame).astype(np.float32)
+
+    energy = np.empty(n, dtype=np.float32)
+    zcr = np.empty(n, dtype=np.float32)
+    flatness = np.empty(n, dtype=np.float32)
+    for i in range(0, n, BLOCK_FRAMES):
+        block = frames[i:i + BLOCK_FRAMES]
+        energy[i:i + len(block)] = 10 * np.log10(np.mean(block ** 2, axis=1) + 1e-10)
+        signs = np.signbit(block)
+        zcr[i:i + len(block)] = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        power = np.abs(np.fft.rfft(block * window, axis=1)) ** 2 + 1e-10
+        # Geometric over arithmetic mean: ~1 for noise, near 0 for voiced speech
+        flatness[i:i + len(block)] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy, zcr, flatness
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end (exclusive) indices of the True runs in `mask`.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def get_speech_timestamps(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    onset_db: float = 12.0,
+    offset_db: float = 6.0,
+    min_speech_db: float = -50.0,
+    max_flatness: float = 0.4,
+    max_zcr: float = 0.35,
+    min_speech_seconds: float = 0.25,
+    min_silence_seconds: float = 0.3,
+    speech_pad_seconds: float = 0.1
+) -> List[Dict[str, float]]:
+    """
+    Lightweight speech detection from frame energy, zero-crossing rate and
+    spectral flatness, a drop-in for vad.get_speech_timestamps (same
+    [{'start', 'end'}] list in seconds) with no torch dependency.
+
+    Thresholds are relative to the recording's noise floor (10th energy
+    percentile). A speech region starts at a frame that is `onset_db`
+    above the floor (and above `min_speech_db`), tonal (low flatness) and
+    not hiss-like (low ZCR), and extends with hysteresis while frames stay
+    `offset_db` above the floor. Gaps shorter than `min_silence_seconds`
+    are bridged, regions shorter than `min_speech_seconds` dropped, and
+    the rest padded by `speech_pad_seconds`.
+    """
+    energy, zcr, flatness = frame_features(audio, sr)
+    hop = HOP_SECONDS
+    frame = FRAME_SECONDS
+
+    floor = float(np.percentile(energy, 10))
+    onset = max(floor + onset_db, min_speech_db)
+    offset = max(floor + offset_db, min_speech_db - (onset_db - offset_db))
+    strong = (energy > onset) & (flatness < max_flatness) & (zcr < max_zcr)
+    weak = energy > offset
+
+    # Hysteresis: keep the weak runs that contain at least one strong frame
+    starts, ends = _runs(weak)
+    if len(starts):
+        # Strong frames per run from a running count
+        inside = np.concatenate(([0], np.cumsum(strong, dtype=np.int64)))
+        strong_count = inside[ends] - inside[starts]
+        keep = strong_count > 0
+        starts, ends = starts[keep], ends[keep]
+
+    # Bridge short silences
+    if len(starts) > 1:
+        gap_frames = int(round(min_silence_seconds / hop))
+        join = starts[1:] - ends[:-1] < gap_frames
+        starts = starts[np.concatenate(([True], ~join))]
+        ends = ends[np.concatenate((~join, [True]))]
+
+    start_s = starts * hop
+    end_s = (ends - 1) * hop + frame
+    long_enough = end_s - start_s >= min_speech_seconds
+    start_s, end_s = start_s[long_enough], end_s[long_enough]
+
+    duration = len(audio) / sr
+    start_s = np.maximum(start_s - speech_pad_seconds, 0.0)
+    end_s = np.minimum(end_s + speech_pad_seconds, duration)
+    if len(start_s) > 1:
+        # Padding must not make neighbours overlap
+        middle = (end_s[:-1] + start_s[1:]) / 2
+        overlap = end_s[:-1] > start_s[1:]
+        end_s[:-1] = np.where(overlap, middle, end_s[:-1])
+        start_s[1:] = np.where(overlap, middle, start_s[1:])
+
+    timestamps = [
+        {'start': round(float(s), 3), 'end': round(float(e), 3)}
+        for s, e in zip(start_s, end_s)
+    ]
+    logger.info(f"Energy VAD found {len(timestamps)} speech segments.")
+    return timestamps
@@ -3,9 +3,17 @@ from tkinter import ttk, filedialog, messagebox
 import threading
 import queue
 from pathlib import Path
-import os
-from src.transcriber import transcribe_video
-from src.utils import write_srt
+from src.pipeline import PrefetchPipeline
+from src.progress import Cancelled, ProgressBus, format_eta
+from src.utils import SrtWriter
+# src.transcriber (torch/whisper) is imported lazily so the window shows
+# instantly
+
+MEDIA_FILETYPES = [
+    ("Video/Audio files", "*.mp4 *.mkv *.avi *.mp3 *.wav *.flac *.m4a"),
+    ("All files", "*.*"),
+]
+
 
 class TranslationApp:
     def __init__(self, root):
@@ -19,64 +27,201 @@ class TranslationApp:
         self.output_language = tk.StringVar(value="en")
         self.use_vad = tk.BooleanVar(value=True)
         self.high_quality = tk.BooleanVar(value=False)
-        
+        self.batch_size = tk.IntVar(value=1)
+        self.recursive = tk.BooleanVar(value=False)
+
         self.progress_queue = queue.Queue()
         self.is_running = False
+        self.bus = None
+        self.file_label = ""
+        # Model size of the running transcription, never evicted
+        self.active_model = None
+
+        # Background model pre-warming
+        self.warm_queue = queue.Queue()
+        self.warm_generation = 0
+        self.warm_model = None
+        # Loads started but not yet picked up by _poll_warm
+        self.warm_pending = 0
+        self.warm_polling = False
 
         self._create_widgets()
+        # Start warming the default model once the window is up
+        self.root.after(100, self._prewarm_model)
 
     def _create_widgets(self):
         main_frame = ttk.Frame(self.root, padding="20")
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         # Input File
-        ttk.Label(main_frame, text="Input:").grid(row=0, column=0, sticky="w", pady=5)
-        ttk.Entry(main_frame, textvariable=self.input_path, width=40).grid(row=0, column=1, padx=5, pady=5)
-        
+        ttk.Label(main_frame, text="Input:").grid(
+            row=0, column=0, sticky="w", pady=5)
+        ttk.Entry(main_frame, textvariable=self.input_path, width=40).grid(
+            row=0, column=1, padx=5, pady=5)
+
         btn_frame = ttk.Frame(main_frame)
         btn_frame.grid(row=0, column=2, pady=5)
-        ttk.Button(btn_frame, text="Files...", command=self._browse_files).pack(side=tk.LEFT, padx=2)
-        ttk.Button(btn_frame, text="Folder...", command=self._browse_folder).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Files...",
+                   command=self._browse_files).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Folder...",
+                   command=self._browse_folder).pack(side=tk.LEFT, padx=2)
 
         # Output Directory
-        ttk.Label(main_frame, text="Output Directory (Optional):").grid(row=1, column=0, sticky="w", pady=5)
-        ttk.Entry(main_frame, textvariable=self.output_dir, width=40).grid(row=1, column=1, padx=5, pady=5)
-        ttk.Button(main_frame, text="Browse...", command=self._browse_output).grid(row=1, column=2, pady=5)
+        ttk.Label(main_frame, text="Output Directory (Optional):").grid(
+            row=1, column=0, sticky="w", pady=5)
+        ttk.Entry(main_frame, textvariable=self.output_dir, width=40).grid(
+            row=1, column=1, padx=5, pady=5)
+        ttk.Button(main_frame, text="Browse...",
+                   command=self._browse_output).grid(row=1, column=2, pady=5)
 
         # Options Frame
-        options_frame = ttk.LabelFrame(main_frame, text="Options", padding="10")
-        options_frame.grid(row=2, column=0, columnspan=3, sticky="ew", pady=20)
+        options_frame = ttk.LabelFrame(
+            main_frame, text="Options", padding="10")
+        options_frame.grid(
+            row=2, column=0, columnspan=3, sticky="ew", pady=20)
 
         # Model Size
-        ttk.Label(options_frame, text="Model Size:").grid(row=0, column=0, sticky="w", padx=5)
-        model_combo = ttk.Combobox(options_frame, textvariable=self.model_size, state="readonly")
-        model_combo['values'] = ('tiny', 'base', 'small', 'medium', 'large')
-        model_combo.grid(row=0, column=1, padx=5)
+        ttk.Label(options_frame, text="Model Size:").grid(
+            row=0, column=0, sticky="w", padx=5)
+        self.model_combo = ttk.Combobox(
+            options_frame, textvariable=self.model_size, state="readonly")
+        self.model_combo['values'] = (
+            'tiny', 'base', 'small', 'medium', 'large')
+        self.model_combo.grid(row=0, column=1, padx=5)
+        self.model_combo.bind(
+            "<<ComboboxSelected>>", lambda _: self._prewarm_model())
+
+        self.model_status = ttk.Label(
+            options_frame, text="", foreground="gray")
+        self.model_status.grid(
+            row=2, column=2, columnspan=2, sticky="w", padx=5)
 
         # Language
-        ttk.Label(options_frame, text="Target Language:").grid(row=0, column=2, sticky="w", padx=5)
-        ttk.Entry(options_frame, textvariable=self.output_language, width=5).grid(row=0, column=3, padx=5)
+        ttk.Label(options_frame, text="Target Language:").grid(
+            row=0, column=2, sticky="w", padx=5)
+        ttk.Entry(
+            options_frame, textvariable=self.output_language, width=5
+        ).grid(row=0, column=3, padx=5)
 
         # VAD Checkbox
-        ttk.Checkbutton(options_frame, text="Use VAD (Recommended)", variable=self.use_vad).grid(row=1, column=0, columnspan=2, sticky="w", pady=10, padx=5)
+        ttk.Checkbutton(
+            options_frame, text="Use VAD (Recommended)",
+            variable=self.use_vad
+        ).grid(row=1, column=0, columnspan=2, sticky="w", pady=10, padx=5)
 
         # High Quality Checkbox
-        ttk.Checkbutton(options_frame, text="High Quality Mode (Slower)", variable=self.high_quality).grid(row=1, column=2, columnspan=2, sticky="w", pady=10, padx=5)
+        ttk.Checkbutton(
+            options_frame, text="High Quality Mode (Slower)",
+            variable=self.high_quality
+        ).grid(row=1, column=2, columnspan=2, sticky="w", pady=10, padx=5)
+
+        # Batch Size
+        ttk.Label(options_frame, text="Batch Size:").grid(
+            row=2, column=0, sticky="w", padx=5)
+        ttk.Spinbox(
+            options_frame, from_=1, to=64, textvariable=self.batch_size,
+            width=5
+        ).grid(row=2, column=1, sticky="w", padx=5)
+
+        # Subfolders Checkbox
+        ttk.Checkbutton(
+            options_frame, text="Include Subfolders", variable=self.recursive
+        ).grid(row=3, column=0, columnspan=2, sticky="w", pady=10, padx=5)
 
         # Progress Bar
         self.progress_var = tk.DoubleVar()
-        self.progress_bar = ttk.Progressbar(main_frame, variable=self.progress_var, maximum=100)
-        self.progress_bar.grid(row=3, column=0, columnspan=3, sticky="ew", pady=20)
-        
+        self.progress_bar = ttk.Progressbar(
+            main_frame, variable=self.progress_var, maximum=100)
+        self.progress_bar.grid(
+            row=3, column=0, columnspan=3, sticky="ew", pady=20)
+
         self.status_label = ttk.Label(main_frame, text="Ready")
         self.status_label.grid(row=4, column=0, columnspan=3, sticky="w")
 
-        # Start Button
-        self.start_button = ttk.Button(main_frame, text="Start Transcription", command=self._start_transcription)
-        self.start_button.grid(row=5, column=0, columnspan=3, pady=10)
+        # Start / Cancel Buttons
+        action_frame = ttk.Frame(main_frame)
+        action_frame.grid(row=5, column=0, columnspan=3, pady=10)
+        self.start_button = ttk.Button(
+            action_frame, text="Start Transcription",
+            command=self._start_transcription)
+        self.start_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(
+            action_frame, text="Cancel",
+            command=self._cancel_transcription, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+    def _prewarm_model(self):
+        """
+        Loads the selected model (and Silero VAD) on a background thread so
+        Start Transcription can begin inference right away. A transcription
+        that starts mid-load waits for the same load instead of repeating it.
+        """
+        size = self.model_size.get()
+        use_vad = self.use_vad.get()
+        self.warm_generation += 1
+        self.warm_pending += 1
+        generation = self.warm_generation
+        self.model_status.config(
+            text=f"Model '{size}': loading...", foreground="orange")
+
+        def load():
+            try:
+                from src.transcriber import load_model
+                load_model(size)
+                if use_vad:
+                    from src.vad import load_silero_vad
+                    load_silero_vad()
+                self.warm_queue.put((generation, size, None))
+            except Exception as e:
+                self.warm_queue.put((generation, size, e))
+
+        threading.Thread(target=load, daemon=True).start()
+        if not self.warm_polling:
+            self.warm_polling = True
+            self.root.after(200, self._poll_warm)
+
+    def _poll_warm(self):
+        # Drain every finished load; only the latest selection's counts
+        current = None
+        while True:
+            try:
+                generation, size, error = self.warm_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.warm_pending -= 1
+            if generation == self.warm_generation:
+                current = (size, error)
+            elif size not in (self.model_size.get(), self.active_model):
+                # A newer selection superseded this load
+                self._evict_model(size)
+
+        if current is not None:
+            size, error = current
+            if error is not None:
+                self.model_status.config(
+                    text=f"Model '{size}': failed to load",
+                    foreground="red")
+            else:
+                self.model_status.config(
+                    text=f"Model '{size}': ready", foreground="green")
+                # Keep only the selected model warm
+                if self.warm_model not in (None, size, self.active_model):
+                    self._evict_model(self.warm_model)
+                self.warm_model = size
+        if self.warm_pending > 0:
+            self.root.after(200, self._poll_warm)
+        else:
+            self.warm_polling = False
+
+    def _evict_model(self, size):
+        # A running transcription holds its own reference to the model
+        from src.models import default_precision, get_device, get_registry
+        device = get_device()
+        get_registry().evict(
+            ("whisper", size, device, default_precision(device)))
 
     def _browse_files(self):
-        filenames = filedialog.askopenfilenames(filetypes=[("Video/Audio files", "*.mp4 *.mkv *.avi *.mp3 *.wav *.flac *.m4a"), ("All files", "*.*")])
+        filenames = filedialog.askopenfilenames(filetypes=MEDIA_FILETYPES)
         if filenames:
             self.input_path.set(";".join(filenames))
 
@@ -98,70 +243,134 @@ class TranslationApp:
         if self.is_running:
             return
 
+        # Tk variables are read here, not from the worker thread, and before
+        # any state changes so a bad entry can't leave the window locked
+        try:
+            settings = dict(
+                input_path=self.input_path.get(),
+                output_dir=self.output_dir.get(),
+                output_language=self.output_language.get(),
+                use_vad=self.use_vad.get(),
+                model_size=self.model_size.get(),
+                high_quality=self.high_quality.get(),
+                batch_size=self.batch_size.get(),
+                recursive=self.recursive.get(),
+            )
+            if settings["batch_size"] < 1:
+                raise ValueError("batch size must be at least 1")
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Invalid settings: {e}")
+            return
+
         self.is_running = True
+        self.active_model = settings["model_size"]
         self.start_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        # The running job's model can't change under it
+        self.model_combo.config(state="disabled")
         self.status_label.config(text="Initializing...")
         self.progress_var.set(0)
 
+        # Progress is coalesced to the poll rate; one message per update
+        self.bus = ProgressBus(min_interval=0.1)
+        self.bus.subscribe(
+            lambda event: self.progress_queue.put(("progress", event)))
+
         # Start background thread
-        thread = threading.Thread(target=self._run_transcription_thread)
+        thread = threading.Thread(
+            target=self._run_transcription_thread, args=(self.bus, settings))
         thread.daemon = True
         thread.start()
 
         # Start polling for progress
         self.root.after(100, self._poll_progress)
 
-    def _run_transcription_thread(self):
+    def _cancel_transcription(self):
+        if self.is_running and self.bus is not None:
+            self.bus.cancel()
+            self.cancel_button.config(state="disabled")
+            self.status_label.config(
+                text="Cancelling after the current segment...")
+
+    def _end_run(self):
+        self.is_running = False
+        self.active_model = None
+        self.start_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        self.model_combo.config(state="readonly")
+        self.progress_bar.stop()
+
+    def _run_transcription_thread(self, bus, settings):
         try:
-            raw_input = self.input_path.get()
+            from src.discovery import build_manifest
+            from src.transcriber import iter_transcribe, prepare_audio
+
+            raw_input = settings["input_path"]
             # Split by ; for multiple files
-            paths = [Path(p.strip()) for p in raw_input.split(';') if p.strip()]
-            
-            all_files = []
-            for p in paths:
-                if p.is_dir():
-                    # Add all video files in dir
-                    extensions = {".mp4", ".mkv", ".avi", ".mov", ".mp3", ".wav", ".flac", ".m4a"}
-                    all_files.extend([f for f in p.iterdir() if f.suffix.lower() in extensions])
-                elif p.is_file():
-                    all_files.append(p)
-            
-            # Remove duplicates and sort
-            all_files = sorted(list(set(all_files)))
-            
+            paths = [Path(p.strip()) for p in raw_input.split(';')
+                     if p.strip()]
+
+            self.progress_queue.put(("file", "Scanning input"))
+            # Largest first; copies of a file each get their subtitles
+            manifest = build_manifest(
+                paths, recursive=settings["recursive"], dedupe=False)
+            all_files = [Path(e["path"]) for e in manifest["files"]]
+
             if not all_files:
-                 self.progress_queue.put(("error", "No valid media files found."))
-                 return
+                self.progress_queue.put(
+                    ("error", "No valid media files found."))
+                return
 
             total_files = len(all_files)
             processed_files = []
 
-            for i, input_path in enumerate(all_files, 1):
-                output_dir = Path(self.output_dir.get()) if self.output_dir.get() else input_path.parent
-                
-                def progress_callback(current, total):
-                    self.progress_queue.put(("progress", (current, total, i, total_files, input_path.name)))
-
-                self.progress_queue.put(("status", f"File {i}/{total_files}: {input_path.name} - Loading..."))
-                
-                subtitles = transcribe_video(
-                    str(input_path),
-                    output_language=self.output_language.get(),
-                    use_vad=self.use_vad.get(),
-                    model_size=self.model_size.get(),
-                    high_quality=self.high_quality.get(),
-                    progress_callback=progress_callback
-                )
-
-                self.progress_queue.put(("status", f"File {i}/{total_files}: {input_path.name} - Saving..."))
-                
+            use_vad = settings["use_vad"]
+            # Decode + VAD of the next file runs while the current one is
+            # transcribed
+            jobs = PrefetchPipeline(
+                all_files,
+                lambda path: prepare_audio(str(path), use_vad=use_vad),
+                max_ahead=1,
+                max_bytes=2048 * 1024 ** 2
+            )
+
+            for i, (input_path, prepared, error) in enumerate(jobs, 1):
+                bus.check_cancelled()
+                if error is not None:
+                    raise error
+                output_dir = (Path(settings["output_dir"])
+                              if settings["output_dir"] else input_path.parent)
+                self.progress_queue.put(
+                    ("file", f"File {i}/{total_files}: {input_path.name}"))
+
                 srt_filename = input_path.stem + ".srt"
                 final_output_path = output_dir / srt_filename
-                write_srt(subtitles, str(final_output_path))
+                # Subtitles are appended as segments finish
+                with SrtWriter(final_output_path) as writer:
+                    for sub in iter_transcribe(
+                        str(input_path),
+                        output_language=settings["output_language"],
+                        use_vad=use_vad,
+                        model_size=settings["model_size"],
+                        high_quality=settings["high_quality"],
+                        batch_size=settings["batch_size"],
+                        progress=bus,
+                        prepared=prepared
+                    ):
+                        writer.write(sub)
+                prepared = None
+
                 processed_files.append(str(final_output_path))
-            
+
             self.progress_queue.put(("done", "\n".join(processed_files)))
 
+        except Cancelled:
+            # Drop the decoded audio and prefetched files before reporting
+            # back
+            jobs = prepared = None
+            if settings["model_size"] != self.warm_model:
+                self._evict_model(settings["model_size"])
+            self.progress_queue.put(("cancelled", len(processed_files)))
         except Exception as e:
             self.progress_queue.put(("error", str(e)))
 
@@ -169,50 +378,59 @@ class TranslationApp:
         try:
             while True:
                 msg_type, data = self.progress_queue.get_nowait()
-                
+
                 if msg_type == "progress":
-                    current, total, file_idx, total_files, filename = data
-                    if total > 0:
-                        percentage = (current / total) * 100
-                        self.progress_var.set(percentage)
-                        self.status_label.config(text=f"File {file_idx}/{total_files}: {filename} - Segment {current}/{total}")
-                
-                elif msg_type == "status":
-                    self.status_label.config(text=data)
-                    if "Loading" in data:
-                        self.progress_bar.config(mode='indeterminate')
-                        self.progress_bar.start(10)
-                    else:
+                    if data["total"] > 0 and not self.bus.cancelled:
                         self.progress_bar.stop()
                         self.progress_bar.config(mode='determinate')
+                        self.progress_var.set(
+                            data["current"] / data["total"] * 100)
+                        self.status_label.config(
+                            text=f"{self.file_label} - Segment "
+                                 f"{data['current']}/{data['total']}"
+                                 f" - ETA {format_eta(data['eta'])}"
+                        )
+
+                elif msg_type == "file":
+                    self.file_label = data
+                    self.status_label.config(text=f"{data} - Loading...")
+                    self.progress_bar.config(mode='indeterminate')
+                    self.progress_bar.start(10)
 
                 elif msg_type == "done":
-                    self.is_running = False
-                    self.start_button.config(state="normal")
-                    self.progress_bar.stop()
+                    self._end_run()
                     self.progress_var.set(100)
                     self.status_label.config(text="Completed!")
-                    messagebox.showinfo("Success", f"Subtitles saved to:\n{data}")
+                    messagebox.showinfo(
+                        "Success", f"Subtitles saved to:\n{data}")
+                    return
+
+                elif msg_type == "cancelled":
+                    self._end_run()
+                    self.progress_bar.config(mode='determinate')
+                    self.status_label.config(
+                        text=f"Cancelled ({data} file(s) completed)")
                     return
 
                 elif msg_type == "error":
-                    self.is_running = False
-                    self.start_button.config(state="normal")
-                    self.progress_bar.stop()
+                    self._end_run()
                     self.status_label.config(text="Error occurred")
-                    messagebox.showerror("Error", f"An error occurred:\n{data}")
+                    messagebox.showerror(
+                        "Error", f"An error occurred:\n{data}")
                     return
 
         except queue.Empty:
             pass
-        
+
         if self.is_running:
             self.root.after(100, self._poll_progress)
 
+
 def main():
     root = tk.Tk()
-    app = TranslationApp(root)
+    TranslationApp(root)
     root.mainloop()
 
+
 if __name__ == "__main__":
     main()
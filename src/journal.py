@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import relevant_options
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+
+def journal_path(output_path: Path) -> Path:
+    """
+    Journal location for an output file: video.srt -> video.journal.jsonl
+    """
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + ".journal.jsonl")
+
+
+def fingerprint(file_path: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Identifies the input file (size, mtime) and every option that affects
+    the result, so a journal is only resumed for the same job.
+    """
+    stat = Path(file_path).stat()
+    return json.loads(json.dumps({
+        "version": JOURNAL_VERSION,
+        "file": str(Path(file_path).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "options": relevant_options(options),
+    }, sort_keys=True, default=str))
+
+
+def _read_records(path: Path, header: Dict[str, Any]) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """
+    Returns the intact records of the journal at `path` and its line count,
+    or None if it is missing or was written for another header.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # Torn write at the moment of the crash
+            break
+    if not records or records[0] != {"type": "header", **header}:
+        return None
+    return records, len(lines)
+
+
+def _replay(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    state: Dict[str, Any] = {"spans": None, "language": None, "segments": {}}
+    for record in records[1:]:
+        if record["type"] == "spans":
+            state["spans"] = record["spans"]
+        elif record["type"] == "language":
+            state["language"] = record["language"]
+        elif record["type"] == "segment":
+            state["segments"][record["index"]] = record["subtitles"]
+    return state
+
+
+def read_journal(path: Path, header: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Reads the journal at `path` without opening it for writing: returns
+    {'spans', 'language', 'segments'} as a resumed Journal would see them,
+    or None if there is no journal for `header`.
+    """
+    loaded = _read_records(Path(path), header)
+    return _replay(loaded[0]) if loaded is not None else None
+
+
+class Journal:
+    """
+    Append-only JSON-lines record of a transcription in progress: the spans
+    being transcribed, the detected language and the subtitles of each
+    finished span. Every record is flushed and fsync'ed, so after a crash
+    the journal holds everything completed up to that point; a partially
+    written last line is ignored on load.
+    """
+
+    def __init__(self, path: Path, header: Dict[str, Any], resume: bool = False):
+        self.path = Path(path)
+        self.spans: Optional[List[Dict[str, float]]] = None
+        self.language: Optional[str] = None
+        self.segments: Dict[int, List[Dict[str, Any]]] = {}
+
+        if resume and self._load(header):
+            logger.info(
+                f"Resuming from {self.path}: {len(self.segments)}"
+                f"/{len(self.spans or ())} segments already transcribed"
+            )
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            if resume and self.path.exists():
+                logger.warning(f"Journal {self.path} is for a different file or options; starting over")
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append({"type": "header", **header})
+
+    def _load(self, header: Dict[str, Any]) -> bool:
+        loaded = _read_records(self.path, header)
+        if loaded is None:
+            return False
+        records, n_lines = loaded
+
+        state = _replay(records)
+        self.spans, self.language, self.segments = state["spans"], state["language"], state["segments"]
+        if len(records) < n_lines:
+            # Drop the torn tail so appended records start on a clean line
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(r) + "\n" for r in records)
+        return True
+
+    def _append(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record_spans(self, spans: List[Dict[str, Any]]):
+        self.spans = [{"start": s["start"], "end": s["end"]} for s in spans]
+        self._append({"type": "spans", "spans": self.spans})
+
+    def record_language(self, language: str):
+        self.language = language
+        self._append({"type": "language", "language": language})
+
+    def record_segment(self, index: int, subtitles: List[Dict[str, Any]]):
+        subtitles = [
+            {"start": s["start"], "end": s["end"], "text": s["text"]}
+            for s in subtitles
+        ]
+        self.segments[index] = subtitles
+        self._append({"type": "segment", "index": index, "subtitles": subtitles})
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def remove(self):
+        """
+        Closes and deletes the journal once the output is complete.
+        """
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,57 @@
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def pick_samples(clips: List[np.ndarray], count: int) -> List[np.ndarray]:
+    """
+    Returns the `count` clips with the highest RMS energy, i.e. the clearest
+    speech to detect the language from.
+    """
+    scored = [
+        (float(np.sqrt(np.mean(clip ** 2))), i)
+        for i, clip in enumerate(clips) if len(clip)
+    ]
+    scored.sort(reverse=True)
+    return [clips[i] for _, i in scored[:count]]
+
+
+def detect_language(model, clips: List[np.ndarray]) -> Tuple[str, Dict[str, float]]:
+    """
+    Detects the spoken language once from a few speech clips: the language
+    probabilities of each clip (first 30s) are averaged. Returns the language
+    code and the averaged probabilities.
+    """
+    import torch
+    from whisper.audio import N_FRAMES, N_SAMPLES, log_mel_spectrogram, pad_or_trim
+
+    if not model.is_multilingual:
+        return "en", {"en": 1.0}
+    if not clips:
+        raise ValueError("No speech to detect the language from")
+
+    mels = []
+    for clip in clips:
+        # Same preprocessing as whisper.transcribe() uses for detection
+        mel = log_mel_spectrogram(clip[:N_SAMPLES], model.dims.n_mels, padding=N_SAMPLES)
+        content_frames = mel.shape[-1] - N_FRAMES
+        mels.append(pad_or_trim(mel[:, :content_frames], N_FRAMES))
+
+    dtype = torch.float16 if model.device.type != "cpu" else torch.float32
+    batch = torch.stack(mels).to(model.device).to(dtype)
+    _, probs = model.detect_language(batch)
+
+    totals: Dict[str, float] = {}
+    for clip_probs in probs:
+        for lang, p in clip_probs.items():
+            totals[lang] = totals.get(lang, 0.0) + p / len(probs)
+
+    language = max(totals, key=totals.get)
+    logger.info(
+        f"Detected language '{language}' ({totals[language]:.0%}) "
+        f"from {len(clips)} speech samples."
+    )
+    return language, totals
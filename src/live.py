@@ -0,0 +1,217 @@
+import logging
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .audio import SAMPLE_RATE, iter_audio_chunks, iter_pcm_chunks
+from .profiling import EventCallback, make_emitter
+
+logger = logging.getLogger(__name__)
+
+# Small reads keep the time between audio arriving and VAD seeing it short
+LIVE_CHUNK_SECONDS = 0.1
+
+_DONE = object()
+
+
+def open_live_source(
+    source: str,
+    raw: bool = False,
+    raw_rate: int = SAMPLE_RATE,
+    chunk_seconds: float = LIVE_CHUNK_SECONDS
+) -> Iterator[np.ndarray]:
+    """
+    Returns 16 kHz float32 chunks from a live source: "-" for stdin, a
+    named pipe, or anything ffmpeg reads (rtsp://, http://, devices...).
+    With `raw`, the source is mono s16le PCM at `raw_rate`; at 16 kHz it
+    is read directly without ffmpeg.
+    """
+    if raw and raw_rate == SAMPLE_RATE:
+        stream = sys.stdin.buffer if source == "-" else open(source, "rb")
+        return iter_pcm_chunks(stream, chunk_seconds)
+    input_args = ["-f", "s16le", "-ac", "1", "-ar", str(raw_rate)] if raw else []
+    return iter_audio_chunks(source, chunk_seconds, input_args=input_args)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "mean": round(float(np.mean(values)), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "max": round(float(np.max(values)), 3),
+    }
+
+
+def latency_summary(utterances: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregates per-utterance timings (seconds) into mean/p50/p95/max.
+    """
+    return {
+        "utterances": len(utterances),
+        "audio_seconds": round(sum(u["end"] - u["start"] for u in utterances), 3),
+        "latency": _percentiles([u["latency"] for u in utterances]),
+        "vad_delay": _percentiles([u["vad_delay"] for u in utterances]),
+        "queue_wait": _percentiles([u["queue_wait"] for u in utterances]),
+        "transcribe": _percentiles([u["transcribe"] for u in utterances]),
+    }
+
+
+def _produce(
+    chunks: Iterable[np.ndarray],
+    utterances: "queue.Queue",
+    max_utterance: float,
+    vad_source: Dict[str, Any]
+):
+    """
+    Reads the source and runs streaming VAD at the pace audio arrives,
+    independently of transcription. Each closed utterance is queued with
+    the wall time its last sample arrived and the time VAD closed it.
+    """
+    from .vad import iter_speech_segments
+
+    # (end sample of chunk, arrival time); only chunks not yet consumed
+    # by an utterance are kept
+    arrivals: List[tuple] = []
+
+    def timed(chunks):
+        position = 0
+        for chunk in chunks:
+            position += len(chunk)
+            arrivals.append((position, time.perf_counter()))
+            yield chunk
+
+    try:
+        for start, end, clip in iter_speech_segments(
+            timed(chunks), max_segment_seconds=max_utterance, **vad_source
+        ):
+            closed = time.perf_counter()
+            end_sample = int(end * SAMPLE_RATE)
+            # First chunk that contains the utterance's last sample
+            k = next(
+                (i for i, (pos, _) in enumerate(arrivals) if pos >= end_sample),
+                len(arrivals) - 1
+            )
+            arrived = arrivals[k][1] if arrivals else closed
+            del arrivals[:k]
+            utterances.put({
+                "start": start, "end": end, "clip": clip,
+                "arrived": arrived, "closed": closed,
+            })
+        utterances.put(_DONE)
+    except BaseException as e:
+        utterances.put(e)
+
+
+def transcribe_live(
+    chunks: Iterable[np.ndarray],
+    output_language: str = "en",
+    source_language: Optional[str] = None,
+    model_size: str = "base",
+    quantize: Optional[str] = None,
+    high_quality: bool = False,
+    batch_size: int = 4,
+    max_utterance: float = 15.0,
+    vad_model_dir: Optional[str] = None,
+    vad_onnx: bool = False,
+    offline: bool = False,
+    on_subtitle: Optional[Callable[[Dict[str, Any]], None]] = None,
+    event_callback: Optional[EventCallback] = None
+) -> Dict[str, Any]:
+    """
+    Transcribes a live PCM stream (see open_live_source): streaming VAD
+    runs on a reader thread, and each utterance is transcribed as soon as
+    it closes and passed to `on_subtitle` as {'start', 'end', 'text'}.
+
+    Latency stays bounded: utterances are cut at `max_utterance` seconds,
+    and when transcription falls behind, all waiting utterances (up to
+    `batch_size`) are decoded together in one batch. Returns the
+    per-utterance latency summary (see latency_summary). Stops at the end
+    of the stream or on KeyboardInterrupt.
+    """
+    from .transcriber import (
+        _resolve_language, _to_subtitles, _transcribe_clips,
+        build_transcribe_options, load_model
+    )
+
+    emit = make_emitter(event_callback, file="live")
+    model, device = load_model(model_size, quantize, offline, emit)
+    transcribe_options = build_transcribe_options(
+        output_language, source_language, high_quality, device
+    )
+    vad_source = dict(model_dir=vad_model_dir, onnx=vad_onnx, offline=offline)
+    # Load VAD before audio starts flowing so the first utterance isn't delayed
+    from .vad import load_silero_vad
+    load_silero_vad(**vad_source)
+
+    pending: "queue.Queue" = queue.Queue()
+    reader = threading.Thread(
+        target=_produce, args=(chunks, pending, max_utterance, vad_source),
+        name="live-vad", daemon=True
+    )
+    reader.start()
+    logger.info("Listening...")
+
+    stats: List[Dict[str, Any]] = []
+    finished = False
+    try:
+        while not finished:
+            batch = [pending.get()]
+            # Catch up: take whatever else is already waiting
+            while len(batch) < batch_size:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            # Reader errors surface after the utterances queued before them
+            error = next((item for item in batch if isinstance(item, BaseException)), None)
+            finished = error is not None or any(item is _DONE for item in batch)
+            batch = [item for item in batch if isinstance(item, dict)]
+            if not batch:
+                if error is not None:
+                    raise error
+                continue
+
+            clips = [u["clip"] for u in batch]
+            _resolve_language(model, clips, transcribe_options, 1, emit)
+            started = time.perf_counter()
+            results = _transcribe_clips(model, clips, transcribe_options)
+            done = time.perf_counter()
+
+            for utterance, segments in zip(batch, results):
+                span = {"start": utterance["start"], "end": utterance["end"]}
+                for sub in _to_subtitles(span, segments):
+                    if on_subtitle:
+                        on_subtitle(sub)
+                emitted = time.perf_counter()
+                timing = {
+                    "start": round(span["start"], 3),
+                    "end": round(span["end"], 3),
+                    "latency": round(emitted - utterance["arrived"], 4),
+                    "vad_delay": round(utterance["closed"] - utterance["arrived"], 4),
+                    "queue_wait": round(started - utterance["closed"], 4),
+                    "transcribe": round((done - started) / len(batch), 4),
+                    "batch": len(batch),
+                }
+                stats.append(timing)
+                emit({"event": "utterance", **timing})
+                logger.debug(f"Utterance {timing}")
+            if error is not None:
+                raise error
+    except KeyboardInterrupt:
+        logger.info("Stopped.")
+
+    summary = latency_summary(stats)
+    if stats:
+        lat = summary["latency"]
+        logger.info(
+            f"{summary['utterances']} utterances, end-to-end latency "
+            f"mean {lat['mean']:.2f}s / p95 {lat['p95']:.2f}s / max {lat['max']:.2f}s"
+        )
+    summary["per_utterance"] = stats
+    return summary
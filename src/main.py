@@ -1,13 +1,31 @@
 import typer
 import logging
+import signal
+import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
-from .utils import write_srt
+from typing import List, Optional, Sequence
+from .cache import DEFAULT_CACHE_DIR, TranscriptCache
+from .profiling import EventCallback, ProfileReport, make_emitter, stage_timer
+from .utils import WRITERS, open_writers
 
 app = typer.Typer(
     help="CLI tool to generate SRT subtitles using Whisper and Silero VAD."
 )
 
+# Kept separate from `app` so `run.py video.mp4` still works without a
+# `generate` subcommand
+serve_app = typer.Typer(
+    help="Run a local transcription daemon that keeps models warm."
+)
+live_app = typer.Typer(
+    help="Transcribe a live audio stream as it arrives."
+)
+discover_app = typer.Typer(
+    help="Find media files and write a job manifest for `generate`."
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,17 +34,203 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def process_file(
+    file_path: Path,
+    output_dir: Optional[Path] = None,
+    cache: Optional[TranscriptCache] = None,
+    rebuild: bool = False,
+    event_callback: Optional[EventCallback] = None,
+    prepared: Optional[dict] = None,
+    formats: Sequence[str] = ("srt",),
+    resume: bool = False,
+    progress=None,
+    **options
+) -> Path:
+    """
+    Transcribes a single file and writes its subtitles next to it (or into
+    output_dir) in each of `formats` (srt, vtt, json). Subtitles are
+    appended as they are transcribed, so the files can be tailed.
+    Returns the path of the first format's file.
+    With a cache, unchanged files are served from stored segments;
+    `rebuild` forces re-transcription and refreshes the entry.
+    Stage timing events go to `event_callback` (see iter_transcribe).
+    `prepared` is prefetched decode/VAD output (see prepare_audio).
+    VAD transcriptions keep a journal next to the output until they finish;
+    with `resume`, a journal left by an interrupted run is continued.
+    `progress` is the ProgressBus for segment progress and cancellation;
+    a cancelled job keeps its journal so it can be resumed.
+    """
+    emit = make_emitter(event_callback, file=str(file_path))
+
+    subtitles = None
+    if cache is not None:
+        with stage_timer(emit, "cache_lookup") as info:
+            key = cache.key_for(file_path, options)
+            if not rebuild:
+                subtitles = cache.get(key)
+            info["hit"] = subtitles is not None
+        if subtitles is not None:
+            logger.info(f"Cache hit for {file_path}, skipping transcription")
+
+    if output_dir:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    srt_path = _output_path(file_path, output_dir)
+
+    if subtitles is not None:
+        with stage_timer(emit, "write_srt", subtitles=len(subtitles), formats=",".join(formats)):
+            with open_writers(srt_path, formats) as writer:
+                for sub in subtitles:
+                    writer.write(sub)
+        return writer.paths[0]
+
+    # Lazy import to avoid loading heavy libraries (Torch/Whisper) just for --help
+    from .transcriber import iter_transcribe
+
+    journal = None
+    if options.get("use_vad", True) and not options.get("stream"):
+        from .journal import Journal, fingerprint, journal_path
+        journal = Journal(
+            journal_path(srt_path), fingerprint(file_path, options), resume=resume
+        )
+
+    subtitles = []
+    write_seconds = 0.0
+    try:
+        with open_writers(srt_path, formats) as writer:
+            for sub in iter_transcribe(
+                str(file_path), event_callback=event_callback, progress=progress,
+                prepared=prepared, journal=journal, **options
+            ):
+                subtitles.append(sub)
+                start = time.perf_counter()
+                writer.write(sub)
+                write_seconds += time.perf_counter() - start
+    finally:
+        if journal is not None:
+            journal.close()
+    if journal is not None:
+        journal.remove()
+    emit({
+        "event": "stage",
+        "stage": "write_srt",
+        "seconds": round(write_seconds, 4),
+        "subtitles": len(subtitles),
+        "formats": ",".join(formats),
+    })
+    if cache is not None:
+        cache.put(key, subtitles)
+    return writer.paths[0]
+
+
+def _output_path(file_path: Path, output_dir: Optional[Path] = None) -> Path:
+    """
+    Path of a file's SRT output (other formats swap the extension).
+    """
+    if output_dir:
+        return output_dir / (file_path.stem + ".srt")
+    return file_path.with_suffix(".srt")
+
+
+def _prefetch_prepare(
+    options: dict,
+    cache: Optional[TranscriptCache] = None,
+    rebuild: bool = False,
+    event_callback: Optional[EventCallback] = None,
+    resume: bool = False,
+    output_dir: Optional[Path] = None
+):
+    """
+    Returns the prepare function for PrefetchPipeline: decode + VAD of a
+    file, skipped (None) for files that will be served from the cache.
+    With `resume`, files with a journal reuse its spans instead of running
+    the VAD, and files whose journal is complete are not decoded at all.
+    """
+    from .journal import fingerprint, journal_path, read_journal
+    from .transcriber import prepare_audio
+
+    def prepare(file_path: Path) -> Optional[dict]:
+        if cache is not None and not rebuild:
+            if cache.get(cache.key_for(file_path, options)) is not None:
+                return None
+        timestamps = None
+        if resume and options.get("use_vad", True):
+            state = read_journal(
+                journal_path(_output_path(file_path, output_dir)), fingerprint(file_path, options)
+            )
+            if state is not None and state["spans"] is not None:
+                if len(state["segments"]) >= len(state["spans"]):
+                    return None
+                timestamps = state["spans"]
+        return prepare_audio(
+            str(file_path), event_callback=event_callback, timestamps=timestamps, **options
+        )
+
+    return prepare
+
+
+def _fit_to_budget(tracker, max_memory: float, job_options: dict):
+    """
+    Between files under --max-memory: returns freed memory to the OS and,
+    if the last file peaked over the budget, halves the batch size.
+    """
+    from .memory import MB, release_memory
+    release_memory()
+    peak = tracker.take_peak() / MB
+    if peak > max_memory and job_options["batch_size"] > 1:
+        job_options["batch_size"] //= 2
+        logger.warning(
+            f"Peak RSS {peak:.0f} MB exceeded --max-memory {max_memory:.0f} MB; "
+            f"batch size lowered to {job_options['batch_size']}"
+        )
+
+
+@contextmanager
+def _cancel_on_interrupt(progress):
+    """
+    The first Ctrl+C cancels `progress` so the current file stops after
+    its batch (journal kept for --resume); a second one aborts at once.
+    """
+    def handler(signum, frame):
+        if progress.cancelled:
+            raise KeyboardInterrupt
+        logger.warning("Cancelling after the current batch; press Ctrl+C again to abort.")
+        progress.cancel()
+
+    previous = signal.signal(signal.SIGINT, handler)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+
+def _exit_cancelled(journaled: bool):
+    if journaled:
+        logger.info("Run again with --resume to continue where it stopped.")
+    raise typer.Exit(code=130)
+
+
 @app.command()
 def generate(
     input_path: Path = typer.Argument(
         ...,
-        help="Path to video file or directory of videos.",
+        help="Path to a video file, a directory of videos, or a manifest "
+             "written by `discover`.",
         exists=True
     ),
     output_language: str = typer.Option(
         "en",
         help="Target language (e.g., 'en'). Whisper translates TO English."
     ),
+    source_language: Optional[str] = typer.Option(
+        None,
+        help="Source language code (e.g. 'ja'). Skips language detection."
+    ),
+    language_samples: int = typer.Option(
+        3,
+        min=1,
+        help="Number of strongest speech segments used to detect the "
+             "source language (once per file)."
+    ),
     model_size: str = typer.Option(
         "base",
         help="Whisper model size (tiny, base, small, medium, large)."
@@ -35,65 +239,644 @@ def generate(
         True,
         help="Use Silero VAD for speech detection."
     ),
+    vad: str = typer.Option(
+        "silero",
+        "--vad",
+        help="Speech detector: 'silero' (neural, needs torch.hub) or "
+             "'energy' (fast NumPy energy/ZCR/flatness detector)."
+    ),
     high_quality: bool = typer.Option(
         False,
         "--high-quality", "-hq",
         help="Enable beam search and strict decoding for better quality (slower)."
     ),
+    batch_size: int = typer.Option(
+        1,
+        min=1,
+        help="Number of VAD segments to encode/decode together. "
+             "Values > 1 speed up CPU inference on many-core machines."
+    ),
     output_dir: Optional[Path] = typer.Option(
         None,
         help="Directory to save SRT files. Defaults to input directory."
+    ),
+    formats: List[str] = typer.Option(
+        ["srt"],
+        "--format",
+        help="Subtitle format to write (srt, vtt, json). Repeat the option "
+             "to write several side by side in one pass."
+    ),
+    coalesce: bool = typer.Option(
+        False,
+        "--coalesce",
+        help="Merge adjacent VAD segments into ~30s windows (and split "
+             "over-long ones) before transcription. Far fewer model calls."
+    ),
+    max_gap: float = typer.Option(
+        1.0,
+        min=0.0,
+        help="Maximum silence in seconds between VAD segments merged by --coalesce."
+    ),
+    segment_padding: float = typer.Option(
+        0.2,
+        min=0.0,
+        help="Seconds of padding added around each --coalesce window."
+    ),
+    max_window: float = typer.Option(
+        30.0,
+        min=1.0,
+        max=30.0,
+        help="Maximum --coalesce window length in seconds."
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Stream audio from ffmpeg in chunks instead of decoding the "
+             "whole file, keeping memory bounded for very long recordings."
+    ),
+    stream_window: float = typer.Option(
+        30.0,
+        min=1.0,
+        help="Maximum seconds of audio buffered per segment in --stream mode."
+    ),
+    vad_model_dir: Optional[Path] = typer.Option(
+        None,
+        help="Local silero-vad checkout to load the VAD model from."
+    ),
+    vad_onnx: bool = typer.Option(
+        False,
+        "--vad-onnx",
+        help="Use Silero's ONNX model instead of TorchScript (needs onnxruntime)."
+    ),
+    quantize: Optional[str] = typer.Option(
+        None,
+        help="Quantize the model for faster CPU inference. Only 'int8' "
+             "(dynamic quantization of linear layers) is supported."
+    ),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Never access the network; fail if a model is not available locally."
+    ),
+    prefetch: int = typer.Option(
+        1,
+        min=0,
+        help="Number of upcoming files to decode and run VAD on in the "
+             "background while the current one is transcribed (0 disables)."
+    ),
+    prefetch_memory: float = typer.Option(
+        2048,
+        min=0,
+        help="Memory limit in MB for decoded audio held by --prefetch "
+             "(the file being transcribed included)."
+    ),
+    workers: int = typer.Option(
+        1,
+        min=1,
+        help="Number of worker processes for directory inputs. "
+             "Each keeps a warm model; CPU threads are split between them."
+    ),
+    cache: bool = typer.Option(
+        True,
+        help="Reuse stored transcriptions for unchanged files."
+    ),
+    rebuild: bool = typer.Option(
+        False,
+        "--rebuild",
+        help="Ignore cached transcriptions and refresh them."
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Continue interrupted transcriptions from their journal "
+             "instead of starting over."
+    ),
+    cache_dir: Path = typer.Option(
+        DEFAULT_CACHE_DIR,
+        help="Directory of the transcription cache."
+    ),
+    cache_size: float = typer.Option(
+        1024,
+        help="Maximum transcription cache size in MB (LRU eviction)."
+    ),
+    profile_out: Optional[Path] = typer.Option(
+        None,
+        help="Write per-stage timings (model load, decode, VAD, each "
+             "segment, SRT writing) to this file (.json or .csv)."
+    ),
+    progress_interval: float = typer.Option(
+        0.2,
+        help="Minimum seconds between progress bar updates (with ETA)."
+    ),
+    model_memory_budget: Optional[float] = typer.Option(
+        None,
+        help="Memory budget in MB for cached models. "
+             "Least-recently-used models are evicted beyond it."
+    ),
+    max_memory: Optional[float] = typer.Option(
+        None,
+        min=1,
+        help="Total RSS budget in MB. Batch size, prefetching and stream "
+             "windows are fitted to it, long files are streamed, and the "
+             "run fails fast if the model cannot fit."
+    ),
+    server: Optional[str] = typer.Option(
+        None,
+        help="Submit the files to a running `serve` daemon instead of "
+             "transcribing locally (unix:/path.sock or http://host:port)."
+    ),
+    recursive: bool = typer.Option(
+        False,
+        help="Also look for media files in subdirectories."
+    ),
+    shard: Optional[str] = typer.Option(
+        None,
+        help="Process only shard i of n (e.g. 2/4) of the files, split by "
+             "duration, to spread a manifest or directory over several machines."
     )
 ):
     """
     Generate SRT subtitles for video file(s).
     """
-    if input_path.is_file():
-        files = [input_path]
-    elif input_path.is_dir():
-        # Extensions to look for
-        extensions = {
-            ".mp4", ".mkv", ".avi", ".mov", ".mp3", ".wav", ".flac", ".m4a"
-        }
-        files = [
-            p for p in input_path.iterdir() if p.suffix.lower() in extensions
-        ]
-        if not files:
-            logger.warning(f"No video/audio files found in {input_path}")
-            return
+    from .discovery import build_manifest, expand_duplicates, load_manifest, parse_shard, shard_entries
+
+    if shard is not None:
+        try:
+            shard_index, shard_count = parse_shard(shard)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--shard")
+    if quantize not in (None, "int8"):
+        raise typer.BadParameter("only 'int8' is supported", param_hint="--quantize")
+    if vad not in ("silero", "energy"):
+        raise typer.BadParameter("choose 'silero' or 'energy'", param_hint="--vad")
+    if resume and stream:
+        raise typer.BadParameter("--stream transcriptions keep no journal", param_hint="--resume")
+    if coalesce and max_window <= 2 * segment_padding:
+        raise typer.BadParameter(
+            f"must be longer than twice --segment-padding ({2 * segment_padding:g}s)",
+            param_hint="--max-window"
+        )
+    unknown = [f for f in formats if f not in WRITERS]
+    if unknown:
+        raise typer.BadParameter(
+            f"unsupported format(s) {', '.join(unknown)}; choose from {', '.join(WRITERS)}",
+            param_hint="--format"
+        )
+    # Each format once, in the given order
+    formats = list(dict.fromkeys(formats))
+
+    manifest = load_manifest(input_path) if input_path.suffix.lower() == ".json" else None
+    if manifest is not None:
+        entries = manifest["files"]
+        logger.info(f"Loaded manifest of {len(entries)} files from {input_path}")
+    elif input_path.exists():
+        # Largest first. Every file gets its own subtitles, so copies of
+        # the same content are not folded (that is for `discover`)
+        entries = build_manifest([input_path], recursive=recursive, dedupe=False)["files"]
     else:
         logger.error(f"Input path {input_path} does not exist.")
         raise typer.Exit(code=1)
+    if shard is not None:
+        entries = shard_entries(entries, shard_index, shard_count)
+        logger.info(
+            f"Shard {shard_index}/{shard_count}: {len(entries)} files, "
+            f"{sum(e['duration'] for e in entries) / 3600:.1f}h of media"
+        )
+    # Copies stay on the shard of their original, next to its cache entry
+    entries = expand_duplicates(entries)
+    files = [Path(e["path"]) for e in entries]
+    if not files:
+        logger.warning(f"No video/audio files found in {input_path}")
+        return
+
+    options = dict(
+        output_language=output_language,
+        source_language=source_language,
+        language_samples=language_samples,
+        use_vad=use_vad,
+        vad=vad,
+        model_size=model_size,
+        high_quality=high_quality,
+        batch_size=batch_size,
+        coalesce=coalesce,
+        max_gap=max_gap,
+        segment_padding=segment_padding,
+        max_window=max_window,
+        stream=stream,
+        stream_window=stream_window,
+        vad_model_dir=str(vad_model_dir) if vad_model_dir else None,
+        vad_onnx=vad_onnx,
+        offline=offline,
+        quantize=quantize
+    )
+
+    job_options = dict(options, rebuild=rebuild, formats=formats, resume=resume)
+    if cache:
+        job_options["cache"] = TranscriptCache(cache_dir, max_size_mb=cache_size)
+
+    profile = ProfileReport() if profile_out else None
 
-    for file_path in files:
+    if server:
+        from .server import submit_files
+        # The daemon's own cache and VAD checkout apply
+        job_options = {k: v for k, v in options.items() if k != "vad_model_dir"}
         try:
-            logger.info(f"Processing {file_path}...")
-            # Lazy import to avoid loading heavy libraries (Torch/Whisper) just for --help
-            from .transcriber import transcribe_video
-            
-            subtitles = transcribe_video(
-                str(file_path),
-                output_language=output_language,
-                use_vad=use_vad,
-                model_size=model_size,
-                high_quality=high_quality
+            submit_files(
+                server, files, output_dir,
+                dict(job_options, rebuild=rebuild, formats=formats, resume=resume),
+                event_callback=profile
             )
+        except ConnectionError as e:
+            logger.error(str(e))
+            raise typer.Exit(code=1)
+        if profile:
+            profile.write(profile_out)
+        return
 
-            # Determine output path
-            if output_dir:
-                output_dir.mkdir(parents=True, exist_ok=True)
-                srt_path = output_dir / (file_path.stem + ".srt")
-            else:
-                srt_path = file_path.with_suffix(".srt")
+    from .models import get_device, get_registry
+    registry = get_registry()
+    registry.set_memory_budget(model_memory_budget)
+
+    # Files whose full decode would not fit the budget
+    streamed = set()
+    if max_memory is not None:
+        from .memory import plan_memory
+        parallel = workers > 1 and len(files) > 1
+        try:
+            plan = plan_memory(
+                max_memory, model_size, quantize,
+                "cpu" if quantize else get_device(),
+                batch_size, stream_window, prefetch_memory,
+                workers=min(workers, len(files)) if parallel else 1
+            )
+        except (MemoryError, ValueError) as e:
+            logger.error(str(e))
+            raise typer.Exit(code=1)
+        for opts in (options, job_options):
+            opts.update(batch_size=plan["batch_size"], stream_window=plan["stream_window"])
+        prefetch_memory = plan["prefetch_memory_mb"]
+        if not stream:
+            streamed = {
+                Path(e["path"]) for e in entries if e["duration"] > plan["max_decode_seconds"]
+            }
+            if streamed:
+                logger.info(f"Streaming {len(streamed)} long file(s) to stay within --max-memory")
+
+    if workers > 1 and len(files) > 1:
+        from .progress import ProgressBus
+        from .workers import run_parallel
+        workers = min(workers, len(files))
+        tracker = None
+        if max_memory is not None:
+            from .memory import MB, MemoryTracker
+            # Not started: it aggregates the peaks measured in the workers
+            tracker = MemoryTracker()
+        # Workers draw no progress bars; the bus carries Ctrl+C to them and
+        # their stage events to the tracker and the profile
+        bus = ProgressBus().subscribe(tracker).subscribe(profile)
+        with _cancel_on_interrupt(bus):
+            run_parallel(
+                files, workers, output_dir, job_options,
+                event_callback=bus if tracker or profile else None,
+                overrides={f: {"stream": True} for f in streamed},
+                progress=bus,
+                track_memory=tracker is not None
+            )
+        if tracker is not None:
+            logger.info(f"Per worker: {tracker.format_summary()}")
+            if tracker.peak / MB > max_memory / workers:
+                logger.warning(
+                    f"A worker peaked at {tracker.peak / MB:.0f} MB, over its "
+                    f"{max_memory / workers:.0f} MB share of --max-memory"
+                )
+        if profile:
+            profile.write(profile_out)
+        if bus.cancelled:
+            _exit_cancelled(use_vad and not stream)
+        return
 
-            write_srt(subtitles, str(srt_path))
-            print(f"Saved subtitles to {srt_path}")  # Force print to stdout
-            logger.info(f"Saved subtitles to {srt_path}")
+    tracker = None
+    if max_memory is not None:
+        from .memory import MemoryTracker
+        tracker = MemoryTracker().start()
 
-        except Exception as e:
-            logger.error(f"Failed to process {file_path}: {e}")
-            # Continue to next file
+    from .progress import Cancelled, ConsoleProgress, ProgressBus
+    # Stage events reach the profile, throttled progress the console; the
+    # tracker annotates stage events with peak RSS before the profile sees them
+    bus = (
+        ProgressBus(progress_interval)
+        .subscribe(ConsoleProgress())
+        .subscribe(tracker)
+        .subscribe(profile)
+    )
+    job_options["event_callback"] = bus
+    job_options["progress"] = bus
+
+    if prefetch > 0 and use_vad and not stream and len(files) > 1:
+        from .pipeline import PrefetchPipeline
+        # Decode/VAD of the next files overlaps with transcription
+        jobs = PrefetchPipeline(
+            files,
+            _prefetch_prepare(
+                options, job_options.get("cache"), rebuild, event_callback=bus,
+                resume=resume, output_dir=output_dir
+            ),
+            max_ahead=prefetch,
+            max_bytes=int(prefetch_memory * 1024 ** 2),
+            # Streamed files run VADIterator on the shared Silero model
+            exclusive=streamed
+        )
+    else:
+        jobs = ((file_path, None, None) for file_path in files)
+
+    with _cancel_on_interrupt(bus):
+        for file_path, prepared, error in jobs:
+            try:
+                if error is not None:
+                    raise error
+                logger.info(f"Processing {file_path}...")
+                file_options = dict(job_options, stream=True) if file_path in streamed else job_options
+                srt_path = process_file(file_path, output_dir, prepared=prepared, **file_options)
+                print(f"Saved subtitles to {srt_path}")  # Force print to stdout
+                logger.info(f"Saved subtitles to {srt_path}")
+
+            except Cancelled:
+                logger.warning(f"Cancelled while processing {file_path}")
+                break
+            except Exception as e:
+                logger.error(f"Failed to process {file_path}: {e}")
+                # Continue to next file
+            finally:
+                # Drop the decoded audio before the next file is prefetched
+                prepared = None
+                if tracker is not None:
+                    _fit_to_budget(tracker, max_memory, job_options)
+        # Stops the prefetch thread and frees what it decoded ahead
+        jobs = None
+
+    logger.info(registry.format_stats())
+    if tracker is not None:
+        tracker.stop()
+        logger.info(tracker.format_summary())
+    if profile:
+        profile.write(profile_out)
+    if bus.cancelled:
+        _exit_cancelled(use_vad and not stream)
+
+
+@discover_app.command()
+def discover(
+    inputs: List[Path] = typer.Argument(
+        ...,
+        help="Media files and/or directories to scan.",
+        exists=True
+    ),
+    output: Path = typer.Option(
+        Path("manifest.json"),
+        "--output", "-o",
+        help="Where to write the JSON manifest."
+    ),
+    recursive: bool = typer.Option(
+        True,
+        help="Scan subdirectories."
+    ),
+    dedupe: bool = typer.Option(
+        True,
+        help="List files with identical content (SHA-256) once."
+    ),
+    workers: int = typer.Option(
+        8,
+        help="Parallel ffprobe/hash workers."
+    )
+):
+    """
+    Walk the inputs, probe every media file's duration and write a manifest
+    (largest first) that `generate` accepts in place of a directory,
+    optionally with --shard i/n on each machine.
+    """
+    from .discovery import build_manifest, write_manifest
+    manifest = build_manifest(inputs, recursive=recursive, workers=workers, dedupe=dedupe)
+    write_manifest(manifest, output)
+    print(f"Saved manifest to {output}")
+
+
+@serve_app.command()
+def serve(
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        help="Listen on this Unix socket instead of TCP."
+    ),
+    host: str = typer.Option(
+        "127.0.0.1",
+        help="Address to listen on (TCP). The API has no authentication; "
+             "only bind other addresses on a trusted network."
+    ),
+    port: int = typer.Option(
+        8765,
+        help="Port to listen on (TCP)."
+    ),
+    concurrency: int = typer.Option(
+        1,
+        min=1,
+        help="Number of files transcribed at once. Each slot is a worker "
+             "process with its own warm model."
+    ),
+    max_queue: int = typer.Option(
+        100,
+        min=1,
+        help="Maximum number of waiting jobs; further submissions are rejected."
+    ),
+    model_size: str = typer.Option(
+        "base",
+        help="Whisper model loaded at startup. Jobs may request others, "
+             "which are then loaded once and kept."
+    ),
+    quantize: Optional[str] = typer.Option(
+        None,
+        help="Quantization of the startup model ('int8')."
+    ),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Never access the network, for the startup model and every job; "
+             "fail if a model is not available locally."
+    ),
+    cache: bool = typer.Option(
+        True,
+        help="Reuse stored transcriptions for unchanged files."
+    ),
+    cache_dir: Path = typer.Option(
+        DEFAULT_CACHE_DIR,
+        help="Directory of the transcription cache."
+    ),
+    cache_size: float = typer.Option(
+        1024,
+        help="Maximum transcription cache size in MB (LRU eviction)."
+    )
+):
+    """
+    Serve transcription jobs over a Unix socket or localhost HTTP.
+    """
+    if quantize not in (None, "int8"):
+        raise typer.BadParameter("only 'int8' is supported", param_hint="--quantize")
+
+    from .server import JobQueue, serve as run_server
+    job_defaults = {}
+    if cache:
+        job_defaults["cache"] = TranscriptCache(cache_dir, max_size_mb=cache_size)
+    jobs = JobQueue(
+        concurrency=concurrency,
+        max_queue=max_queue,
+        warm_options={"model_size": model_size, "quantize": quantize, "offline": offline},
+        job_defaults=job_defaults,
+        # Clients can't make an offline daemon download models
+        job_overrides={"offline": True} if offline else None
+    )
+    run_server(jobs, host=host, port=port, socket_path=socket_path)
+
+
+@live_app.command()
+def live(
+    source: str = typer.Argument(
+        ...,
+        help="'-' for stdin, a named pipe, or any ffmpeg input (e.g. rtsp://...)."
+    ),
+    raw: bool = typer.Option(
+        False,
+        "--raw",
+        help="Source is raw mono s16le PCM (at --raw-rate) instead of a container."
+    ),
+    raw_rate: int = typer.Option(
+        16000,
+        help="Sample rate of --raw input in Hz."
+    ),
+    output_language: str = typer.Option(
+        "en",
+        help="Target language (e.g., 'en'). Whisper translates TO English."
+    ),
+    source_language: Optional[str] = typer.Option(
+        None,
+        help="Source language code (e.g. 'ja'). Otherwise detected from "
+             "the first utterance."
+    ),
+    model_size: str = typer.Option(
+        "base",
+        help="Whisper model size (tiny, base, small, medium, large)."
+    ),
+    high_quality: bool = typer.Option(
+        False,
+        "--high-quality", "-hq",
+        help="Enable beam search and strict decoding for better quality (slower)."
+    ),
+    quantize: Optional[str] = typer.Option(
+        None,
+        help="Quantize the model for faster CPU inference ('int8')."
+    ),
+    batch_size: int = typer.Option(
+        4,
+        min=1,
+        help="Maximum number of waiting utterances decoded together when "
+             "transcription falls behind the stream."
+    ),
+    max_utterance: float = typer.Option(
+        15.0,
+        min=1.0,
+        max=30.0,
+        help="Utterances longer than this many seconds are cut, bounding latency."
+    ),
+    vad_model_dir: Optional[Path] = typer.Option(
+        None,
+        help="Local silero-vad checkout to load the VAD model from."
+    ),
+    vad_onnx: bool = typer.Option(
+        False,
+        "--vad-onnx",
+        help="Use Silero's ONNX model instead of TorchScript (needs onnxruntime)."
+    ),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Never access the network; fail if a model is not available locally."
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        help="Also append subtitles to this file (e.g. live.srt) as they are produced."
+    ),
+    formats: List[str] = typer.Option(
+        ["srt"],
+        "--format",
+        help="Formats written with --output (srt, vtt, json); repeatable."
+    ),
+    stats_out: Optional[Path] = typer.Option(
+        None,
+        help="Write per-utterance latency statistics to this JSON file."
+    )
+):
+    """
+    Transcribe a live stream, printing each utterance as soon as it ends.
+    """
+    if quantize not in (None, "int8"):
+        raise typer.BadParameter("only 'int8' is supported", param_hint="--quantize")
+    unknown = [f for f in formats if f not in WRITERS]
+    if unknown:
+        raise typer.BadParameter(
+            f"unsupported format(s) {', '.join(unknown)}; choose from {', '.join(WRITERS)}",
+            param_hint="--format"
+        )
+
+    from .live import open_live_source, transcribe_live
+    from .utils import format_timestamp
+
+    writer = open_writers(output, dict.fromkeys(formats)) if output else None
+
+    def on_subtitle(sub):
+        print(
+            f"[{format_timestamp(sub['start'])} --> {format_timestamp(sub['end'])}] {sub['text']}",
+            flush=True
+        )
+        if writer is not None:
+            writer.write(sub)
+
+    try:
+        stats = transcribe_live(
+            open_live_source(source, raw=raw, raw_rate=raw_rate),
+            output_language=output_language,
+            source_language=source_language,
+            model_size=model_size,
+            quantize=quantize,
+            high_quality=high_quality,
+            batch_size=batch_size,
+            max_utterance=max_utterance,
+            vad_model_dir=str(vad_model_dir) if vad_model_dir else None,
+            vad_onnx=vad_onnx,
+            offline=offline,
+            on_subtitle=on_subtitle
+        )
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if stats_out:
+        import json
+        stats_out.parent.mkdir(parents=True, exist_ok=True)
+        stats_out.write_text(json.dumps(stats, indent=2))
+        logger.info(f"Wrote latency statistics to {stats_out}")
+
+
+def cli():
+    """
+    Entry point: `serve ...` starts the daemon, `live ...` transcribes a
+    stream, `discover ...` writes a job manifest, anything else is `generate`.
+    """
+    commands = {"serve": serve_app, "live": live_app, "discover": discover_app}
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command in commands and not Path(command).exists():
+        sys.argv.pop(1)
+        commands[command](prog_name=f"{Path(sys.argv[0]).name} {command}")
+    else:
+        app()
 
 
 if __name__ == "__main__":
-    app()
+    cli()
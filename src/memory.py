@@ -0,0 +1,283 @@
+import bisect
+import collections
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 ** 2
+
+# Whisper parameter counts per model family
+MODEL_PARAMS = {
+    "tiny": 39e6,
+    "base": 74e6,
+    "small": 244e6,
+    "medium": 769e6,
+    "large": 1550e6,
+    # large-v3's encoder with a 4-layer decoder
+    "turbo": 809e6,
+}
+
+# Every model name whisper.load_model accepts, by family
+MODEL_FAMILIES = {
+    "tiny": "tiny",
+    "tiny.en": "tiny",
+    "base": "base",
+    "base.en": "base",
+    "small": "small",
+    "small.en": "small",
+    "medium": "medium",
+    "medium.en": "medium",
+    "large": "large",
+    "large-v1": "large",
+    "large-v2": "large",
+    "large-v3": "large",
+    "large-v3-turbo": "turbo",
+    "turbo": "turbo",
+}
+
+# Rough CPU working set per segment in a decode batch (mel, encoder
+# activations, decoder kv-cache), in MB; measure with --profile-out
+BATCH_ITEM_MB = {
+    "tiny": 40,
+    "base": 60,
+    "small": 150,
+    "medium": 350,
+    "large": 600,
+    # Same encoder as large, much smaller decoder cache
+    "turbo": 500,
+}
+
+# Interpreter, torch, whisper and Silero before any model is loaded
+RUNTIME_MB = 700
+
+# whisper.load_audio's peak: the s16le bytes from ffmpeg, the float32
+# astype() copy and the float32 result of the division by 32768
+DECODE_BYTES_PER_SECOND = SAMPLE_RATE * (2 + 4 + 4)
+AUDIO_BYTES_PER_SECOND = SAMPLE_RATE * 4
+
+# Shortest window --stream is allowed to shrink to
+MIN_STREAM_WINDOW = 5.0
+
+
+def current_rss() -> Optional[int]:
+    """
+    Resident set size of this process in bytes, or None if unknown
+    (no /proc and no psutil).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def release_memory():
+    """
+    Drops unreachable objects, cached CUDA blocks and, on glibc, returns
+    freed heap pages to the OS so RSS goes down between files.
+    """
+    from .models import _release_device_memory
+    _release_device_memory()
+    try:
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MemoryTracker:
+    """
+    Samples RSS on a background thread. As an event subscriber it adds
+    'peak_rss_mb' to stage events (the peak over the stage's duration) and
+    keeps the peak per stage; subscribe it before a ProfileReport so the
+    field is recorded there too. Events that already carry 'peak_rss_mb'
+    (from worker processes) are only recorded, so a tracker that was never
+    started aggregates the peaks of its workers.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._window_peak = 0
+        self.stage_peaks: Dict[str, int] = {}
+        # (time, rss) samples with strictly decreasing rss: each is the peak
+        # since its own time, so peak_since is a bisect. Bounded like the
+        # 1.5 hours of raw samples it stands for at the default interval
+        self._peaks: collections.deque = collections.deque(maxlen=100_000)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MemoryTracker":
+        if current_rss() is None:
+            logger.warning("Cannot read RSS on this platform; peak memory is not tracked.")
+            return self
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _sample(self) -> int:
+        rss = current_rss() or 0
+        with self._lock:
+            while self._peaks and self._peaks[-1][1] <= rss:
+                self._peaks.pop()
+            self._peaks.append((time.perf_counter(), rss))
+            self.peak = max(self.peak, rss)
+            self._window_peak = max(self._window_peak, rss)
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def peak_since(self, since: float) -> int:
+        """
+        Highest RSS (bytes) sampled since perf_counter() time `since`.
+        """
+        self._sample()
+        with self._lock:
+            # The latest sample always counts, even for a `since` ahead of it
+            index = bisect.bisect_left(self._peaks, (since,))
+            return self._peaks[min(index, len(self._peaks) - 1)][1]
+
+    def take_peak(self) -> int:
+        """
+        Highest RSS (bytes) since the previous take_peak() or start().
+        """
+        self._sample()
+        with self._lock:
+            peak, self._window_peak = self._window_peak, 0
+        return peak
+
+    def __call__(self, event: Dict[str, Any]):
+        if event.get("event") != "stage":
+            return
+        if "peak_rss_mb" in event:
+            # Measured by the worker process that ran the stage
+            peak = int(event["peak_rss_mb"] * MB)
+            with self._lock:
+                self.peak = max(self.peak, peak)
+        else:
+            peak = self.peak_since(time.perf_counter() - event["seconds"])
+            event["peak_rss_mb"] = round(peak / MB, 1)
+        stage = event["stage"]
+        self.stage_peaks[stage] = max(self.stage_peaks.get(stage, 0), peak)
+
+    def format_summary(self) -> str:
+        stages = ", ".join(
+            f"{stage} {peak / MB:.0f}"
+            for stage, peak in sorted(self.stage_peaks.items(), key=lambda item: -item[1])
+        )
+        return f"Peak RSS {self.peak / MB:.0f} MB (per stage, MB: {stages or 'n/a'})"
+
+
+def _model_family(model_size: str) -> str:
+    family = MODEL_FAMILIES.get(model_size)
+    if family is None:
+        raise ValueError(f"unknown model size '{model_size}'; choose from {', '.join(MODEL_FAMILIES)}")
+    return family
+
+
+def estimate_model_mb(model_size: str, quantize: Optional[str], device: str) -> float:
+    """
+    Peak host memory (MB) for loading the model: fp32 weights on CPU, plus
+    the int8 copy while quantizing (int8 lowers the resident size, not the
+    load peak). On CUDA the weights live on the GPU.
+    """
+    params = MODEL_PARAMS[_model_family(model_size)]
+    if device != "cpu" and quantize is None:
+        return 0.0
+    fp32 = params * 4 / MB
+    return fp32 * 1.25 if quantize == "int8" else fp32
+
+
+def plan_memory(
+    max_memory_mb: float,
+    model_size: str,
+    quantize: Optional[str],
+    device: str,
+    batch_size: int,
+    stream_window: float,
+    prefetch_memory_mb: float,
+    workers: int = 1
+) -> Dict[str, Any]:
+    """
+    Fits a job into `max_memory_mb` of RSS per machine (split evenly across
+    `workers` processes): the model and runtime first, then `batch_size`
+    segments of decode working set, and what remains for decoded audio.
+
+    Returns {'batch_size', 'stream_window', 'prefetch_memory_mb',
+    'max_decode_seconds'}: files longer than max_decode_seconds must be
+    transcribed with --stream. Raises MemoryError when even batch size 1
+    with streaming cannot fit.
+    """
+    family = _model_family(model_size)
+    if quantize:
+        # int8 models always run on the CPU (see load_whisper_model)
+        device = "cpu"
+    budget = max_memory_mb / workers
+    model_mb = estimate_model_mb(model_size, quantize, device)
+    # On CUDA, activations live in GPU memory
+    item_mb = BATCH_ITEM_MB[family] if device == "cpu" else 0.0
+    min_audio_mb = MIN_STREAM_WINDOW * AUDIO_BYTES_PER_SECOND / MB
+    needed = RUNTIME_MB + model_mb + item_mb + min_audio_mb
+    if needed > budget:
+        per_worker = f" per worker ({workers} workers)" if workers > 1 else ""
+        raise MemoryError(
+            f"Model '{model_size}'{' (int8)' if quantize else ''} needs about "
+            f"{needed:.0f} MB (runtime {RUNTIME_MB} MB, model {model_mb:.0f} MB, "
+            f"decoding {item_mb:.0f} MB) but the budget is {budget:.0f} MB{per_worker}. "
+            f"Use a smaller model, fewer --workers or a larger --max-memory."
+        )
+    if device != "cpu":
+        _check_gpu_fits(model_size, family)
+
+    available = budget - RUNTIME_MB - model_mb
+    # Batches may take at most half of what's left; audio gets the rest
+    if item_mb:
+        batch_size = max(1, min(batch_size, int(available / 2 // item_mb)))
+    audio_mb = available - batch_size * item_mb
+
+    window = min(stream_window, audio_mb * MB / (batch_size * AUDIO_BYTES_PER_SECOND))
+    plan = {
+        "batch_size": batch_size,
+        "stream_window": max(MIN_STREAM_WINDOW, round(window, 1)),
+        # Includes the file being transcribed, see PrefetchPipeline
+        "prefetch_memory_mb": min(prefetch_memory_mb, audio_mb),
+        "max_decode_seconds": audio_mb * MB / DECODE_BYTES_PER_SECOND,
+    }
+    logger.info(
+        f"Memory plan for {budget:.0f} MB: model ~{model_mb:.0f} MB, batch size "
+        f"{plan['batch_size']}, files over {plan['max_decode_seconds'] / 60:.0f} min "
+        f"streamed in {plan['stream_window']:.0f}s windows"
+    )
+    return plan
+
+
+def _check_gpu_fits(model_size: str, family: str):
+    import torch
+    free, _ = torch.cuda.mem_get_info()
+    # fp16 weights plus room for activations
+    needed = MODEL_PARAMS[family] * 2 * 1.5
+    if needed > free:
+        raise MemoryError(
+            f"Model '{model_size}' needs about {needed / MB:.0f} MB of GPU memory "
+            f"but only {free / MB:.0f} MB is free. Use a smaller model or --quantize int8 (CPU)."
+        )
@@ -0,0 +1,267 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _tensor_bytes(value: Any) -> int:
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(v) for v in value)
+    if hasattr(value, "numel") and hasattr(value, "element_size"):
+        return value.numel() * value.element_size()
+    return 0
+
+
+def model_memory_bytes(model: Any) -> int:
+    """
+    Estimates the memory held by a torch module from its state dict, which
+    also covers the packed weights of quantized layers.
+    For (model, helpers) tuples, as returned by torch.hub, the first item
+    is measured. Returns 0 for objects that are not torch modules.
+    """
+    if isinstance(model, tuple) and model:
+        model = model[0]
+    state_dict = getattr(model, "state_dict", None)
+    if state_dict is None:
+        return 0
+    return sum(_tensor_bytes(v) for v in state_dict().values())
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models.
+
+    Models are keyed by a hashable tuple (e.g. model size, device, precision)
+    and loaded at most once. When a memory budget is set, the least-recently
+    used models are evicted until the cached models fit in it again.
+    """
+
+    def __init__(self, memory_budget_mb: Optional[float] = None):
+        self.memory_budget_mb = memory_budget_mb
+        self._models: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.RLock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached model for `key`, calling `loader()` on a miss.
+        Concurrent requests for the same key wait for a single load.
+        """
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key]
+
+            start = time.perf_counter()
+            model = loader()
+            elapsed = time.perf_counter() - start
+            size = model_memory_bytes(model)
+            logger.info(
+                f"Loaded model {key} in {elapsed:.2f}s "
+                f"({size / 1024 ** 2:.0f} MB)"
+            )
+
+            with self._lock:
+                self.misses += 1
+                self.load_seconds += elapsed
+                self._models[key] = model
+                self._sizes[key] = size
+                self._key_locks.pop(key, None)
+                self._evict_over_budget(keep=key)
+            return model
+
+    def contains(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def evict(self, key: Hashable) -> bool:
+        """
+        Drops a single model from the cache. Returns True if it was cached.
+        """
+        with self._lock:
+            if key not in self._models:
+                return False
+            del self._models[key]
+            self._sizes.pop(key, None)
+            self.evictions += 1
+        _release_device_memory()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self.evictions += len(self._models)
+            self._models.clear()
+            self._sizes.clear()
+        _release_device_memory()
+
+    def set_memory_budget(self, memory_budget_mb: Optional[float]):
+        with self._lock:
+            self.memory_budget_mb = memory_budget_mb
+            self._evict_over_budget()
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def _evict_over_budget(self, keep: Optional[Hashable] = None):
+        if self.memory_budget_mb is None:
+            return
+        budget = self.memory_budget_mb * 1024 ** 2
+        evicted = False
+        while sum(self._sizes.values()) > budget:
+            candidates = [k for k in self._models if k != keep]
+            if not candidates:
+                break
+            oldest = candidates[0]
+            logger.info(f"Evicting model {oldest} to stay within memory budget")
+            del self._models[oldest]
+            self._sizes.pop(oldest, None)
+            self.evictions += 1
+            evicted = True
+        if evicted:
+            _release_device_memory()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 3),
+                "cached_models": [str(k) for k in self._models],
+                "memory_mb": round(sum(self._sizes.values()) / 1024 ** 2, 1),
+            }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (
+            f"Model cache: {s['hits']} hits, {s['misses']} misses, "
+            f"{s['evictions']} evictions, {s['load_seconds']:.2f}s loading, "
+            f"{s['memory_mb']:.0f} MB cached"
+        )
+
+
+def _release_device_memory():
+    try:
+        import gc
+        import torch
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+_registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    return _registry
+
+
+def get_device() -> str:
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def default_precision(device: str) -> str:
+    return "fp32" if device == "cpu" else "fp16"
+
+
+def _check_whisper_checkpoint(model_size: str):
+    """
+    Raises if the checkpoint for `model_size` would have to be downloaded.
+    """
+    import os
+    import whisper
+    if os.path.isfile(model_size) or model_size not in whisper._MODELS:
+        return
+    cache_root = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    checkpoint = os.path.join(
+        cache_root, "whisper", os.path.basename(whisper._MODELS[model_size])
+    )
+    if not os.path.isfile(checkpoint):
+        raise RuntimeError(
+            f"Offline mode: Whisper checkpoint for '{model_size}' not found "
+            f"at {checkpoint}. Copy it there from a connected machine."
+        )
+
+
+def quantize_int8(model):
+    """
+    Applies dynamic int8 quantization to the Linear layers of a Whisper
+    model (CPU only). Weights are stored as int8 and activations are
+    quantized on the fly; embeddings, convolutions and layer norms stay fp32.
+    """
+    import torch
+    from whisper.model import Linear
+
+    # whisper.model.Linear only casts weights to the input dtype; quantize
+    # only accepts plain nn.Linear, so swap them first
+    def to_plain_linear(module):
+        for name, child in module.named_children():
+            if isinstance(child, Linear):
+                plain = torch.nn.Linear(
+                    child.in_features, child.out_features, bias=child.bias is not None
+                )
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+            else:
+                to_plain_linear(child)
+
+    to_plain_linear(model)
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def load_whisper_model(
+    model_size: str,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    offline: bool = False
+):
+    """
+    Returns a Whisper model from the process-wide registry, loading it on
+    first use for the given (model_size, device, precision).
+    precision "int8" loads a dynamically quantized CPU model; the quantized
+    model is what gets cached, not the fp32 original.
+    With `offline`, fails instead of downloading a missing checkpoint.
+    """
+    device = device or get_device()
+    precision = precision or default_precision(device)
+    if precision == "int8" and device != "cpu":
+        logger.warning("int8 quantization is CPU-only; loading the model on cpu.")
+        device = "cpu"
+
+    def loader():
+        import whisper
+        if offline:
+            _check_whisper_checkpoint(model_size)
+        logger.info(f"Loading Whisper model '{model_size}' on {device}...")
+        model = whisper.load_model(model_size, device=device)
+        if precision == "int8":
+            logger.info(f"Quantizing '{model_size}' linear layers to int8...")
+            model = quantize_int8(model)
+        return model
+
+    return _registry.get(("whisper", model_size, device, precision), loader)
@@ -0,0 +1,118 @@
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Collection, Iterator, List, Optional, Tuple
+
+from .audio import SAMPLE_RATE, probe_duration
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def estimate_decoded_bytes(path: Path) -> int:
+    """
+    Size of the float32 16 kHz buffer a file decodes to, from its duration.
+    """
+    return int(probe_duration(str(path)) * SAMPLE_RATE * 4)
+
+
+class PrefetchPipeline:
+    """
+    Runs `prepare(path)` (decode + VAD) for upcoming files on a background
+    thread while the caller transcribes the current one.
+
+    Backpressure: at most `max_ahead` prepared files wait beyond the one
+    being consumed, and the estimated decoded size of all of them (current
+    file included) stays under `max_bytes`. One file is always allowed so
+    a single huge input can't deadlock the pipeline.
+
+    Files in `exclusive` are prepared by the caller itself (e.g. streamed
+    with their own VAD, which shares the Silero model's state): they are
+    yielded with None, reserve no bytes, and nothing else is prepared
+    while one is being consumed.
+
+    Iterating yields (path, prepared, error); errors from `prepare` are
+    passed through so the caller can handle them per file.
+    """
+
+    def __init__(
+        self,
+        files: List[Path],
+        prepare: Callable[[Path], Any],
+        max_ahead: int = 1,
+        max_bytes: Optional[int] = None,
+        estimate: Callable[[Path], int] = estimate_decoded_bytes,
+        exclusive: Collection[Path] = ()
+    ):
+        self.files = list(files)
+        self.prepare = prepare
+        self.max_ahead = max_ahead
+        self.max_bytes = max_bytes
+        self.estimate = estimate
+        self.exclusive = exclusive
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._bytes = 0
+        self._stop = threading.Event()
+
+    def _has_room(self, size: int) -> bool:
+        if self._in_flight == 0:
+            return True
+        if self._in_flight >= self.max_ahead + 1:
+            return False
+        return self.max_bytes is None or self._bytes + size <= self.max_bytes
+
+    def _produce(self):
+        for path in self.files:
+            exclusive = path in self.exclusive
+            size = self.estimate(path) if self.max_bytes is not None and not exclusive else 0
+            with self._cond:
+                while not self._stop.is_set() and not self._has_room(size):
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                # Reserve before decoding so memory is bounded during prepare
+                self._in_flight += 1
+                self._bytes += size
+
+            if exclusive:
+                self._queue.put((path, None, None, size))
+                with self._cond:
+                    while not self._stop.is_set() and self._in_flight > 0:
+                        self._cond.wait()
+                    if self._stop.is_set():
+                        return
+                continue
+            try:
+                self._queue.put((path, self.prepare(path), None, size))
+            except Exception as e:
+                self._queue.put((path, None, e, size))
+        self._queue.put(_DONE)
+
+    def _release(self, size: int):
+        with self._cond:
+            self._in_flight -= 1
+            self._bytes -= size
+            self._cond.notify_all()
+
+    def __iter__(self) -> Iterator[Tuple[Path, Any, Optional[Exception]]]:
+        producer = threading.Thread(target=self._produce, name="prefetch", daemon=True)
+        producer.start()
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is _DONE:
+                    break
+                path, prepared, error, size = entry
+                yield path, prepared, error
+                # The caller asked for the next file, so this one is done;
+                # `entry` still references the audio too
+                del prepared, entry
+                self._release(size)
+        finally:
+            self._stop.set()
+            with self._cond:
+                self._cond.notify_all()
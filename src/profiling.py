@@ -0,0 +1,104 @@
+import csv
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+
+def _ignore(event: Dict[str, Any]):
+    pass
+
+
+def make_emitter(event_callback: Optional[EventCallback], **context) -> EventCallback:
+    """
+    Returns a callback that adds `context` fields (e.g. the file name) to
+    every event, or a no-op when no callback was given.
+    """
+    if event_callback is None:
+        return _ignore
+
+    def emit(event: Dict[str, Any]):
+        event_callback({**context, **event})
+    return emit
+
+
+@contextmanager
+def stage_timer(emit: EventCallback, stage: str, **fields):
+    """
+    Times the enclosed block and emits a stage event. The yielded dict can
+    be filled with extra fields (token counts, segment totals...) before the
+    block ends.
+    """
+    info = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        emit({
+            "event": "stage",
+            "stage": stage,
+            "seconds": round(time.perf_counter() - start, 4),
+            **info
+        })
+
+
+class ProfileReport:
+    """
+    Collects stage events from transcribe_video/process_file and writes
+    them, with a per-stage summary, as JSON or CSV.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict[str, Any]):
+        if event.get("event") == "progress":
+            # Throttled UI updates, not timings
+            return
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        stages: Dict[str, List[float]] = {}
+        for event in self.events:
+            if event.get("event") == "stage":
+                stages.setdefault(event["stage"], []).append(event["seconds"])
+        return {
+            name: {
+                "count": len(times),
+                "total_seconds": round(sum(times), 4),
+                "mean_seconds": round(sum(times) / len(times), 4),
+                "max_seconds": round(max(times), 4),
+            }
+            for name, times in stages.items()
+        }
+
+    def write(self, path: Path):
+        """
+        Writes the report; the format follows the extension (.csv or JSON).
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            events = list(self.events)
+
+        if path.suffix.lower() == ".csv":
+            columns: List[str] = []
+            for event in events:
+                columns.extend(k for k in event if k not in columns)
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(events)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"summary": self.summary(), "events": events}, f, indent=2)
+        logger.info(f"Wrote profile ({len(events)} events) to {path}")
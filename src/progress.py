@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .profiling import EventCallback
+
+logger = logging.getLogger(__name__)
+
+
+class Cancelled(Exception):
+    """
+    Raised inside a transcription when its ProgressBus was cancelled.
+    """
+
+
+class ProgressBus:
+    """
+    Shared event bus for transcription jobs, used by the CLI and the GUI.
+    It is an EventCallback itself: stage events reach every subscriber as
+    they come, while "progress" events (one per segment) are coalesced to
+    at most one per `min_interval` seconds per file, the last of a file
+    always being delivered.
+
+    Progress events carry an ETA from the measured real-time factor
+    (wall seconds per second of audio transcribed so far).
+
+    `cancel()` requests cooperative cancellation: transcription checks the
+    bus between segment batches and raises Cancelled, dropping its audio
+    buffers on the way out. `cancel_event` shares the flag with other
+    processes (a multiprocessing Event, see workers.run_parallel).
+    """
+
+    def __init__(self, min_interval: float = 0.2, cancel_event=None):
+        self.min_interval = min_interval
+        self._subscribers: List[EventCallback] = []
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._cancel = cancel_event if cancel_event is not None else threading.Event()
+
+    def subscribe(self, callback: Optional[EventCallback]) -> "ProgressBus":
+        if callback is not None:
+            self._subscribers.append(callback)
+        return self
+
+    def __call__(self, event: Dict[str, Any]):
+        for callback in self._subscribers:
+            callback(event)
+
+    def start(self, file: str, total: int, audio_seconds: float = 0.0):
+        """
+        Starts timing `file`: `total` segments (0 if unknown, e.g. streaming)
+        spanning `audio_seconds` of audio.
+        """
+        with self._lock:
+            self._files[file] = {
+                "total": total,
+                "audio_total": audio_seconds,
+                "started": time.perf_counter(),
+                "last_sent": None,
+                "current": 0,
+                "audio_done": 0.0,
+                # Audio replayed from a journal took no time; keep it out of the rate
+                "audio_skipped": 0.0,
+            }
+
+    def advance(self, file: str, current: int, audio_done: float, skipped: bool = False):
+        """
+        Reports that `current` segments (`audio_done` seconds of audio) of
+        `file` are done. `skipped` marks progress that cost no transcription
+        (journal replay).
+        """
+        now = time.perf_counter()
+        with self._lock:
+            state = self._files.get(file)
+            if state is None:
+                return
+            if skipped:
+                state["audio_skipped"] += audio_done - state["audio_done"]
+            state["audio_done"] = audio_done
+            state["current"] = current
+            final = state["total"] and current >= state["total"]
+            if not final and state["last_sent"] is not None and now - state["last_sent"] < self.min_interval:
+                return
+            state["last_sent"] = now
+            event = self._progress_event(file, state, now)
+        self(event)
+
+    def finish(self, file: str):
+        """
+        Ends `file` (done, failed or cancelled) with a final progress event
+        marked "done", so subscribers can close their display.
+        """
+        with self._lock:
+            state = self._files.pop(file, None)
+            if state is None:
+                return
+            event = self._progress_event(file, state, time.perf_counter())
+        self({**event, "done": True})
+
+    def _progress_event(self, file: str, state: Dict[str, Any], now: float) -> Dict[str, Any]:
+        elapsed = now - state["started"]
+        measured = state["audio_done"] - state["audio_skipped"]
+        rtf = elapsed / measured if measured > 0 else None
+        remaining = state["audio_total"] - state["audio_done"]
+        return {
+            "event": "progress",
+            "file": file,
+            "current": state["current"],
+            "total": state["total"],
+            "audio_done": round(state["audio_done"], 3),
+            "audio_total": round(state["audio_total"], 3),
+            "elapsed": round(elapsed, 3),
+            "rtf": round(rtf, 4) if rtf is not None else None,
+            "eta": round(max(rtf * remaining, 0.0), 1) if rtf is not None and state["audio_total"] else None,
+        }
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise Cancelled("Transcription cancelled")
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    if hours:
+        return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+    return f"{rest // 60:02d}:{rest % 60:02d}"
+
+
+class ConsoleProgress:
+    """
+    Bus subscriber that renders progress events as tqdm bars, one per file.
+    """
+
+    def __init__(self):
+        self._bars: Dict[str, Any] = {}
+
+    def __call__(self, event: Dict[str, Any]):
+        if event.get("event") != "progress":
+            return
+        from tqdm import tqdm
+        file = event["file"]
+        bar = self._bars.get(file)
+        if bar is None:
+            bar = self._bars[file] = tqdm(
+                total=event["total"] or None, desc="Transcribing segments", unit="seg"
+            )
+        bar.n = event["current"]
+        if event["rtf"] is not None:
+            bar.set_postfix_str(f"{1 / event['rtf']:.1f}x realtime, ETA {format_eta(event['eta'])}", refresh=False)
+        bar.refresh()
+        if event.get("done"):
+            bar.close()
+            del self._bars[file]
+
@@ -0,0 +1,87 @@
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Whisper processes audio in 30s windows
+WHISPER_WINDOW_SECONDS = 30.0
+
+# Frame size used to find low-energy split points
+ENERGY_FRAME_SECONDS = 0.02
+
+
+def split_at_low_energy(
+    audio: np.ndarray,
+    start: float,
+    end: float,
+    max_length: float
+) -> List[Dict[str, float]]:
+    """
+    Splits [start, end) into pieces no longer than `max_length` seconds,
+    cutting each piece at the quietest 20 ms frame in its second half so
+    words are less likely to be cut.
+    """
+    pieces = []
+    frame = int(ENERGY_FRAME_SECONDS * SAMPLE_RATE)
+    while end - start > max_length:
+        search_from = int((start + max_length / 2) * SAMPLE_RATE)
+        search_to = int((start + max_length) * SAMPLE_RATE)
+        region = audio[search_from:search_to]
+        n_frames = len(region) // frame
+        if n_frames == 0:
+            cut = start + max_length
+        else:
+            frames = region[:n_frames * frame].reshape(n_frames, frame)
+            energy = np.mean(frames ** 2, axis=1)
+            cut = (search_from + int(np.argmin(energy)) * frame + frame // 2) / SAMPLE_RATE
+        pieces.append({'start': start, 'end': cut})
+        start = cut
+    pieces.append({'start': start, 'end': end})
+    return pieces
+
+
+def schedule_windows(
+    audio: np.ndarray,
+    timestamps: List[Dict[str, Any]],
+    max_gap: float = 1.0,
+    padding: float = 0.2,
+    max_window: float = WHISPER_WINDOW_SECONDS
+) -> List[Dict[str, float]]:
+    """
+    Turns VAD segments into transcription windows close to Whisper's 30s
+    input: adjacent segments separated by at most `max_gap` seconds are
+    merged, segments that can't fit a window are split at low-energy points,
+    and each window is padded by `padding` seconds (without overlapping its
+    neighbours). Windows are contiguous spans of the original audio, so
+    Whisper's timestamps map back to absolute time by adding window['start'].
+    Raises ValueError if `max_window` is not longer than twice `padding`.
+    """
+    duration = len(audio) / SAMPLE_RATE
+    max_window = min(max_window, WHISPER_WINDOW_SECONDS)
+    max_content = max_window - 2 * padding
+    if max_content <= 0:
+        raise ValueError(f"max_window ({max_window}s) must be longer than twice the padding ({padding}s)")
+
+    windows: List[Dict[str, float]] = []
+    for segment in sorted(timestamps, key=lambda s: s['start']):
+        for piece in split_at_low_energy(audio, segment['start'], segment['end'], max_content):
+            if windows:
+                last = windows[-1]
+                if (piece['start'] - last['end'] <= max_gap
+                        and piece['end'] - last['start'] <= max_content):
+                    last['end'] = max(last['end'], piece['end'])
+                    continue
+            windows.append(dict(piece))
+
+    previous_end = 0.0
+    for window in windows:
+        window['start'] = max(previous_end, window['start'] - padding, 0.0)
+        window['end'] = min(duration, window['end'] + padding)
+        previous_end = window['end']
+
+    logger.info(f"Scheduled {len(timestamps)} VAD segments into {len(windows)} windows.")
+    return windows
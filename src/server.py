@@ -0,0 +1,553 @@
+import http.client
+import json
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .workers import _init_worker, _run_job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 1000
+
+# Longest a single status request may block (clients re-poll)
+MAX_WAIT_SECONDS = 60.0
+
+FINISHED = ("done", "failed")
+
+# How long submit_files keeps retrying an unreachable daemon while polling
+RECONNECT_SECONDS = 60.0
+RETRY_INTERVAL = 2.0
+
+# Times submit_files resubmits a file the daemon lost (e.g. by restarting)
+MAX_RESUBMITS = 3
+
+_NUMBER = (int, float)
+_OPTIONAL_STR = (str, type(None))
+
+# Options a client may set per job, with their accepted types. Paths
+# (cache, VAD checkout) are the daemon's own and can't be overridden.
+JOB_OPTIONS = {
+    "output_language": (str,),
+    "source_language": _OPTIONAL_STR,
+    "language_samples": (int,),
+    "use_vad": (bool,),
+    "vad": (str,),
+    "model_size": (str,),
+    "high_quality": (bool,),
+    "batch_size": (int,),
+    "coalesce": (bool,),
+    "max_gap": _NUMBER,
+    "segment_padding": _NUMBER,
+    "max_window": _NUMBER,
+    "stream": (bool,),
+    "stream_window": _NUMBER,
+    "vad_onnx": (bool,),
+    "offline": (bool,),
+    "quantize": _OPTIONAL_STR,
+    "rebuild": (bool,),
+    "formats": (list,),
+    "resume": (bool,),
+}
+
+# Bounds of numeric options (inclusive, None for open), as generate's CLI
+# enforces them
+OPTION_RANGES = {
+    "batch_size": (1, None),
+    "language_samples": (1, None),
+    "max_gap": (0.0, None),
+    "segment_padding": (0.0, None),
+    "max_window": (1.0, 30.0),
+    "stream_window": (1.0, None),
+}
+
+
+def validate_options(options: Any) -> Dict[str, Any]:
+    """
+    Checks a client's job options against JOB_OPTIONS and returns them.
+    Raises ValueError naming the first bad key.
+    """
+    from .utils import WRITERS
+    if options is None:
+        return {}
+    if not isinstance(options, dict):
+        raise ValueError("options must be a JSON object")
+    for key, value in options.items():
+        types = JOB_OPTIONS.get(key)
+        if types is None:
+            raise ValueError(f"unknown option '{key}'")
+        # bool is an int subclass, but true is not a batch size
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f"option '{key}' has the wrong type")
+    if options.get("vad", "silero") not in ("silero", "energy"):
+        raise ValueError("option 'vad' must be 'silero' or 'energy'")
+    if options.get("quantize") not in (None, "int8"):
+        raise ValueError("option 'quantize' must be 'int8' or null")
+    for key, (low, high) in OPTION_RANGES.items():
+        value = options.get(key)
+        if value is None:
+            continue
+        if not math.isfinite(value) or (low is not None and value < low) or (high is not None and value > high):
+            bounds = f"between {low} and {high}" if high is not None else f"at least {low}"
+            raise ValueError(f"option '{key}' must be {bounds}")
+    if options.get("coalesce") and options.get("max_window", 30.0) <= 2 * options.get("segment_padding", 0.2):
+        raise ValueError("option 'max_window' must be longer than twice 'segment_padding'")
+    if not all(isinstance(f, str) and f in WRITERS for f in options.get("formats", ())):
+        raise ValueError(f"option 'formats' must list formats from {', '.join(WRITERS)}")
+    return options
+
+
+class JobQueue:
+    """
+    Transcription jobs served by a pool of warm worker processes.
+
+    Jobs wait in a bounded FIFO queue; `concurrency` dispatcher threads each
+    hand one job at a time to the pool, so at most `concurrency` files are
+    transcribed at once. Each worker process loads its models once (see
+    workers._init_worker) and keeps them for every later job.
+
+    A job's options are `job_defaults`, then the client's options, then
+    `job_overrides`, which clients can't change (e.g. offline=True for a
+    daemon started with --offline).
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 1,
+        max_queue: int = 100,
+        warm_options: Optional[Dict[str, Any]] = None,
+        job_defaults: Optional[Dict[str, Any]] = None,
+        job_overrides: Optional[Dict[str, Any]] = None
+    ):
+        self.concurrency = concurrency
+        self.warm_options = warm_options or {"model_size": "base"}
+        self.job_defaults = job_defaults or {}
+        self.job_overrides = job_overrides or {}
+        self.started = time.time()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max_queue)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        self._new_pool()
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._dispatch, name=f"dispatch-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job queue started with concurrency {self.concurrency}.")
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _new_pool(self, broken: Optional[ProcessPoolExecutor] = None):
+        with self._pool_lock:
+            if self._pool is not broken:
+                # Another dispatcher already replaced it
+                return
+            num_threads = max(1, (os.cpu_count() or 1) // self.concurrency)
+            # spawn avoids forking a process that may already hold torch threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(num_threads, self.warm_options)
+            )
+
+    def submit(
+        self,
+        file_path: str,
+        output_dir: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        collect_events: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Queues a file and returns its job. Raises queue.Full when the
+        queue is at capacity.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "file": file_path,
+            "output_dir": output_dir,
+            "options": {**self.job_defaults, **(options or {}), **self.job_overrides},
+            "collect_events": collect_events,
+            "status": "queued",
+            "srt": None,
+            "error": None,
+            "events": [],
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+        }
+        with self._cond:
+            self._jobs[job["id"]] = job
+        try:
+            self._queue.put_nowait(job["id"])
+        except queue.Full:
+            with self._cond:
+                del self._jobs[job["id"]]
+            raise
+        logger.info(f"Queued job {job['id']} for {file_path}")
+        return self.view(job["id"])
+
+    def view(self, job_id: str, wait: float = 0.0, events: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Returns the public fields of a job, or None if unknown. With `wait`,
+        blocks up to that many seconds for the job to finish.
+        """
+        deadline = time.monotonic() + min(wait, MAX_WAIT_SECONDS)
+        with self._cond:
+            job = self._jobs.get(job_id)
+            while job is not None and job["status"] not in FINISHED:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if job is None:
+                return None
+            view = {
+                k: job[k] for k in
+                ("id", "file", "status", "srt", "error", "submitted", "started", "finished")
+            }
+            if events:
+                view["events"] = list(job["events"])
+            return view
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            ids = list(self._jobs)
+        return [v for v in (self.view(i) for i in ids) if v is not None]
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            counts = {s: 0 for s in ("queued", "running") + FINISHED}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self._queue.maxsize,
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "jobs": counts,
+        }
+
+    def _dispatch(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._cond:
+                job = self._jobs[job_id]
+                job["status"] = "running"
+                job["started"] = time.time()
+                self._cond.notify_all()
+
+            pool = self._pool
+            try:
+                srt_path, events = pool.submit(
+                    _run_job,
+                    Path(job["file"]),
+                    Path(job["output_dir"]) if job["output_dir"] else None,
+                    job["options"],
+                    job["collect_events"]
+                ).result()
+                update = {"status": "done", "srt": str(srt_path), "events": events}
+                logger.info(f"Job {job_id} done: {srt_path}")
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); later jobs get a fresh pool
+                update = {"status": "failed", "error": f"worker process died: {e}"}
+                logger.error(f"Job {job_id} failed: worker process died, restarting pool")
+                self._new_pool(broken=pool)
+            except Exception as e:
+                update = {"status": "failed", "error": str(e)}
+                logger.error(f"Job {job_id} failed: {e}")
+
+            with self._cond:
+                job.update(update, finished=time.time())
+                self._prune()
+                self._cond.notify_all()
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j["status"] in FINISHED]
+        for job in sorted(finished, key=lambda j: j["finished"])[:-MAX_FINISHED_JOBS]:
+            del self._jobs[job["id"]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    JSON API:
+        POST /jobs                {"file", "output_dir", "options", "events"}
+        GET  /jobs                all known jobs
+        GET  /jobs/<id>?wait=30   one job, optionally blocking until finished
+                                  (&events=1 adds its stage events)
+        GET  /status              queue counters
+    """
+
+    server_version = "translation-tool"
+
+    @property
+    def jobs(self) -> JobQueue:
+        return self.server.jobs
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _reply(self, code: int, body: Any):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+        if parts == ["status"]:
+            self._reply(200, self.jobs.status())
+        elif parts == ["jobs"]:
+            self._reply(200, self.jobs.list())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            try:
+                wait = float(query.get("wait", ["0"])[0])
+            except ValueError:
+                self._reply(400, {"error": "wait must be a number"})
+                return
+            job = self.jobs.view(parts[1], wait=wait, events="events" in query)
+            if job is None:
+                self._reply(404, {"error": "unknown job"})
+            else:
+                self._reply(200, job)
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if urlparse(self.path).path.strip("/") != "jobs":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            file_path = request["file"]
+            if not isinstance(file_path, str):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {"error": "expected a JSON body with a 'file' key"})
+            return
+        output_dir = request.get("output_dir")
+        if output_dir is not None and not (isinstance(output_dir, str) and Path(output_dir).is_dir()):
+            self._reply(400, {"error": "output_dir must be an existing directory on the server"})
+            return
+        try:
+            options = validate_options(request.get("options"))
+        except ValueError as e:
+            self._reply(400, {"error": str(e)})
+            return
+        if not Path(file_path).is_file():
+            self._reply(400, {"error": f"{file_path} is not a file on the server"})
+            return
+        try:
+            job = self.jobs.submit(
+                file_path,
+                output_dir=output_dir,
+                options=options,
+                collect_events=bool(request.get("events"))
+            )
+        except queue.Full:
+            self._reply(503, {"error": "job queue is full"})
+            return
+        self._reply(202, job)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(
+    jobs: JobQueue,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[Path] = None
+):
+    """
+    Serves the job API on a Unix socket (if `socket_path` is given) or on
+    host:port until interrupted.
+    """
+    if socket_path is not None:
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            socket_path.unlink()
+        httpd = _UnixHTTPServer(str(socket_path), _Handler)
+        # Only the owner may submit jobs
+        os.chmod(socket_path, 0o600)
+        where = f"unix:{socket_path}"
+    else:
+        httpd = ThreadingHTTPServer((host, port), _Handler)
+        where = f"http://{host}:{httpd.server_address[1]}"
+    httpd.jobs = jobs
+
+    jobs.start()
+    logger.info(f"Serving transcription jobs on {where}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        httpd.server_close()
+        jobs.shutdown()
+        if socket_path is not None and socket_path.exists():
+            socket_path.unlink()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """
+    Parses 'unix:/path.sock', '/path.sock', 'http://host:port' or
+    'host:port' into ('unix', path) or ('tcp', (host, port)).
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    if address.startswith("/") or address.endswith(".sock"):
+        return "unix", address
+    url = urlparse(address if "://" in address else f"http://{address}")
+    return "tcp", (url.hostname or DEFAULT_HOST, url.port or DEFAULT_PORT)
+
+
+def request(address: str, method: str, path: str, body: Any = None,
+            timeout: float = MAX_WAIT_SECONDS + 10) -> Tuple[int, Any]:
+    """
+    Sends one JSON request to a `serve` daemon. Returns (status, body).
+    """
+    kind, target = parse_address(address)
+    if kind == "unix":
+        conn = _UnixHTTPConnection(target, timeout)
+    else:
+        conn = http.client.HTTPConnection(*target, timeout=timeout)
+    try:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data else {}
+        conn.request(method, path, body=data, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        conn.close()
+
+
+def _request_retrying(address: str, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+    """
+    request(), retrying an unreachable daemon (e.g. while it restarts) for
+    up to RECONNECT_SECONDS. Raises ConnectionError after that.
+    """
+    failing_since = None
+    while True:
+        try:
+            return request(address, method, path, body)
+        except (OSError, http.client.HTTPException) as e:
+            now = time.monotonic()
+            failing_since = failing_since or now
+            if now - failing_since > RECONNECT_SECONDS:
+                raise ConnectionError(f"lost connection to the server at {address}: {e}") from e
+            logger.warning(f"Lost connection to {address} ({e}), retrying...")
+            time.sleep(RETRY_INTERVAL)
+
+
+def submit_files(
+    address: str,
+    files: List[Path],
+    output_dir: Optional[Path],
+    options: Dict[str, Any],
+    event_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> List[Path]:
+    """
+    Submits all files to a `serve` daemon, then waits for each job. Stage
+    events recorded by the daemon are forwarded to `event_callback`.
+    Returns the paths of the written SRT files. Raises ConnectionError if
+    the daemon is unreachable at submission. While waiting, a lost
+    connection is retried for up to RECONNECT_SECONDS, and jobs the daemon
+    no longer knows (its job table is in memory, so a restart loses it)
+    are submitted again. `options` may only use JOB_OPTIONS keys.
+    """
+    pending = []
+    for file_path in files:
+        body = {
+            "file": str(Path(file_path).resolve()),
+            "output_dir": str(Path(output_dir).resolve()) if output_dir else None,
+            "options": options,
+            "events": event_callback is not None,
+        }
+        try:
+            status, job = request(address, "POST", "/jobs", body)
+        except OSError as e:
+            raise ConnectionError(f"Cannot reach transcription server at {address}: {e}") from e
+        if status != 202:
+            logger.error(f"Failed to submit {file_path}: {job.get('error')}")
+            continue
+        pending.append((file_path, body, job["id"]))
+
+    written = []
+    query = f"wait={MAX_WAIT_SECONDS:.0f}" + ("&events=1" if event_callback else "")
+    for file_path, body, job_id in pending:
+        resubmits = 0
+        try:
+            while True:
+                status, job = _request_retrying(address, "GET", f"/jobs/{job_id}?{query}")
+                if status == 404 and resubmits < MAX_RESUBMITS:
+                    resubmits += 1
+                    logger.warning(f"Server lost the job for {file_path}; submitting it again")
+                    status, job = _request_retrying(address, "POST", "/jobs", body)
+                    if status != 202:
+                        break
+                    job_id = job["id"]
+                    continue
+                if status != 200 or job["status"] in FINISHED:
+                    break
+        except ConnectionError as e:
+            status, job = None, {"error": str(e)}
+
+        if status != 200:
+            logger.error(f"Failed to process {file_path}: {job.get('error')}")
+        elif job["status"] == "failed":
+            logger.error(f"Failed to process {file_path}: {job['error']}")
+        else:
+            for event in job.get("events", ()):
+                event_callback(event)
+            print(f"Saved subtitles to {job['srt']}")  # Force print to stdout
+            logger.info(f"Saved subtitles to {job['srt']}")
+            written.append(Path(job["srt"]))
+    return written
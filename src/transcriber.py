@@ -1,31 +1,237 @@
 import whisper
 import logging
+import time
+import numpy as np
 import torch
-from typing import List, Dict, Any, Callable, Optional
-from tqdm import tqdm
+from typing import List, Dict, Any, Iterator, Optional
+from .audio import SAMPLE_RATE, iter_audio_chunks, load_audio, probe_duration
+from .batching import decode_batch
+from .journal import Journal
+from .language import detect_language, pick_samples
+from .models import load_whisper_model
+from .profiling import EventCallback, make_emitter, stage_timer
+from .progress import ConsoleProgress, ProgressBus
+from .scheduling import schedule_windows
 
 logger = logging.getLogger(__name__)
 
+# Segments shorter than 0.1s are skipped
+MIN_SEGMENT_SAMPLES = SAMPLE_RATE // 10
 
-def transcribe_video(
+
+def transcribe_video(video_path: str, **options) -> List[Dict[str, Any]]:
+    """
+    Transcribes (or translates to English) a media file and returns a list
+    of dicts with 'start', 'end' and 'text' keys.
+    Takes the same options as iter_transcribe.
+    """
+    return list(iter_transcribe(video_path, **options))
+
+
+def iter_transcribe(
     video_path: str,
     output_language: str = "en",
     use_vad: bool = True,
     model_size: str = "base",
     high_quality: bool = False,
-    progress_callback: Optional[Callable[[int, int], None]] = None
-) -> List[Dict[str, Any]]:
+    batch_size: int = 1,
+    stream: bool = False,
+    stream_window: float = 30.0,
+    vad: str = "silero",
+    vad_model_dir: Optional[str] = None,
+    vad_onnx: bool = False,
+    offline: bool = False,
+    quantize: Optional[str] = None,
+    source_language: Optional[str] = None,
+    language_samples: int = 3,
+    coalesce: bool = False,
+    max_gap: float = 1.0,
+    segment_padding: float = 0.2,
+    max_window: float = 30.0,
+    progress: Optional[ProgressBus] = None,
+    event_callback: Optional[EventCallback] = None,
+    prepared: Optional[Dict[str, Any]] = None,
+    journal: Optional[Journal] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Transcribes (or translates to English) a media file and yields dicts
+    with 'start', 'end' and 'text' keys in time order, each as soon as its
+    segment (or batch of segments) is done.
+
+    Per-segment progress (with ETA) is published on `progress`, which is
+    also checked between batches for cancellation (raising Cancelled);
+    without one, a tqdm bar is shown. If given, `event_callback(event)`
+    receives stage timing events (model load, decode, VAD, each segment's
+    transcription, ...) as dicts.
+    `prepared` is the result of prepare_audio() for this file (e.g. from a
+    prefetch thread); decode and VAD are then skipped.
+    With a `journal` (VAD path only), spans, the language and each finished
+    segment are recorded as they complete, and segments already in the
+    journal are replayed instead of transcribed again.
+    """
+    emit = make_emitter(event_callback, file=video_path)
+    if progress is None:
+        progress = ProgressBus().subscribe(ConsoleProgress())
+
+    progress.check_cancelled()
+    model, device = load_model(model_size, quantize, offline, emit)
+    vad_source = dict(model_dir=vad_model_dir, onnx=vad_onnx, offline=offline)
+    transcribe_options = build_transcribe_options(
+        output_language, source_language, high_quality, device
+    )
+    task = transcribe_options["task"]
+
+    if stream:
+        if use_vad and vad != "silero":
+            logger.warning(f"--stream uses Silero's streaming VAD; ignoring --vad {vad}.")
+        # Segment count is unknown up front; the ETA follows the media position
+        progress.start(video_path, 0, probe_duration(video_path))
+        try:
+            yield from _transcribe_stream(
+                model, video_path, transcribe_options, use_vad,
+                batch_size, stream_window, vad_source, language_samples,
+                progress, emit
+            )
+        finally:
+            progress.finish(video_path)
+        return
+
+    if use_vad:
+        if journal is not None and journal.spans is not None:
+            # Resuming: VAD and scheduling were done by the previous run
+            timestamps = journal.spans
+            done = journal.segments
+            audio = None
+            if len(done) < len(timestamps):
+                audio = prepared["audio"] if prepared is not None else _decode(video_path, emit)
+            if transcribe_options["language"] is None:
+                transcribe_options["language"] = journal.language
+        else:
+            if prepared is None:
+                prepared = prepare_audio(
+                    video_path, vad=vad, vad_model_dir=vad_model_dir, vad_onnx=vad_onnx,
+                    offline=offline, event_callback=event_callback
+                )
+            audio, timestamps = prepared["audio"], prepared["timestamps"]
+            done = {}
+
+            if coalesce:
+                with stage_timer(emit, "schedule", segments=len(timestamps)) as info:
+                    timestamps = schedule_windows(
+                        audio, timestamps,
+                        max_gap=max_gap, padding=segment_padding, max_window=max_window
+                    )
+                    info["windows"] = len(timestamps)
+            if journal is not None:
+                journal.record_spans(timestamps)
+
+        todo = [i for i in range(len(timestamps)) if i not in done]
+        if todo:
+            _resolve_language(
+                model,
+                [audio[int(timestamps[i]['start'] * SAMPLE_RATE):int(timestamps[i]['end'] * SAMPLE_RATE)] for i in todo],
+                transcribe_options, language_samples, emit
+            )
+            if journal is not None and journal.language is None and transcribe_options["language"]:
+                journal.record_language(transcribe_options["language"])
+
+        total_segments = len(timestamps)
+        logger.info(
+            f"Transcribing {len(todo)} of {total_segments} segments (batch size {batch_size})..."
+        )
+
+        # Progress and ETA are measured in seconds of speech
+        audio_done = 0.0
+        progress.start(video_path, total_segments, sum(s['end'] - s['start'] for s in timestamps))
+
+        # Journaled segments are replayed in order between the new batches
+        next_index = 0
 
+        def replay(until: int):
+            nonlocal next_index, audio_done
+            for index in range(next_index, until):
+                audio_done += timestamps[index]['end'] - timestamps[index]['start']
+                progress.advance(video_path, index + 1, audio_done, skipped=True)
+                yield from done[index]
+            next_index = max(next_index, until)
+
+        try:
+            for batch_start in range(0, len(todo), batch_size):
+                progress.check_cancelled()
+                indices = todo[batch_start:batch_start + batch_size]
+                batch = [timestamps[i] for i in indices]
+                clips = [
+                    audio[int(seg['start'] * SAMPLE_RATE):int(seg['end'] * SAMPLE_RATE)]
+                    for seg in batch
+                ]
+                results = _transcribe_timed(
+                    model, clips, batch, indices[0], transcribe_options, emit
+                )
+
+                for index, segment, segments in zip(indices, batch, results):
+                    yield from replay(index)
+                    audio_done += segment['end'] - segment['start']
+                    progress.advance(video_path, index + 1, audio_done)
+
+                    subtitles = _to_subtitles(segment, segments, split=coalesce)
+                    if journal is not None:
+                        journal.record_segment(index, subtitles)
+                    next_index = index + 1
+                    yield from subtitles
+            yield from replay(total_segments)
+        finally:
+            progress.finish(video_path)
+    else:
+        logger.info(f"Transcribing full video with Whisper (task={task})...")
+        progress.start(video_path, 1)
+        with stage_timer(emit, "transcribe") as info:
+            result = model.transcribe(video_path, **transcribe_options)
+            info["tokens"] = sum(len(s['tokens']) for s in result['segments'])
+            info["segments"] = len(result['segments'])
+        progress.advance(video_path, 1, 0.0)
+        progress.finish(video_path)
+        yield from result['segments']
+
+
+def load_model(
+    model_size: str,
+    quantize: Optional[str] = None,
+    offline: bool = False,
+    emit: Optional[EventCallback] = None
+):
+    """
+    Returns (model, device) for a Whisper model from the registry, emitting
+    a 'model_load' stage event.
+    """
+    emit = emit or make_emitter(None)
     device = "cuda" if torch.cuda.is_available() else "cpu"
-    logger.info(f"Loading Whisper model '{model_size}' on {device}...")
-    model = whisper.load_model(model_size, device=device)
+    if quantize == "int8":
+        # Dynamic quantization only runs on CPU
+        device = "cpu"
+    with stage_timer(emit, "model_load", model_size=model_size, device=device, precision=quantize):
+        model = load_whisper_model(
+            model_size, device=device, precision=quantize, offline=offline
+        )
+    return model, device
 
+
+def build_transcribe_options(
+    output_language: str,
+    source_language: Optional[str],
+    high_quality: bool,
+    device: str
+) -> Dict[str, Any]:
+    """
+    Whisper task, language and decoding options for the requested output.
+    The language is None when it still has to be detected.
+    """
     # Determine task and language arguments for Whisper
     # Whisper 'translate' task is always to English.
     # 'transcribe' task preserves source language.
     if output_language.lower() == "en":
         task = "translate"
-        whisper_lang = None  # Let Whisper detect source language
+        # Detected once per file unless given explicitly
+        whisper_lang = source_language
     else:
         task = "transcribe"
         whisper_lang = output_language  # Assume source is the output language
@@ -35,76 +241,300 @@ def transcribe_video(
             f"Assuming source language is '{output_language}' "
             "and using 'transcribe' task."
         )
+        if source_language and source_language != output_language:
+            logger.warning(
+                f"--source-language '{source_language}' ignored: the "
+                "'transcribe' task keeps the source language."
+            )
 
-    if use_vad:
-        from .vad import get_speech_timestamps
-        logger.info("Detecting speech segments using Silero VAD...")
-        timestamps = get_speech_timestamps(video_path)
+    # Transcribe options for the sequential path
+    transcribe_options = {
+        "language": whisper_lang,
+        "task": task,
+        "fp16": False if device == "cpu" else True
+    }
 
-        logger.info("Loading audio for transcription...")
-        audio = whisper.load_audio(video_path)
+    if high_quality:
+        transcribe_options.update({
+            "beam_size": 5,
+            "best_of": 5,
+            "temperature": 0.0
+        })
+    return transcribe_options
 
-        subtitles = []
 
-        total_segments = len(timestamps)
-        logger.info(f"Transcribing {total_segments} segments...")
-        
-        with tqdm(timestamps, desc="Transcribing segments", unit="seg") as pbar:
-            for i, segment in enumerate(pbar):
-                if progress_callback:
-                    progress_callback(i, total_segments)
-
-                start_sec = segment['start']
-                end_sec = segment['end']
-
-                start_sample = int(start_sec * 16000)
-                end_sample = int(end_sec * 16000)
-
-                audio_segment = audio[start_sample:end_sample]
-
-                # Skip very short segments (< 0.1s)
-                if len(audio_segment) < 1600:
-                    continue
-
-                # Transcribe segment
-                transcribe_options = {
-                    "language": whisper_lang,
-                    "task": task,
-                    "fp16": False if device == "cpu" else True
+def prepare_audio(
+    video_path: str,
+    use_vad: bool = True,
+    stream: bool = False,
+    vad: str = "silero",
+    vad_model_dir: Optional[str] = None,
+    vad_onnx: bool = False,
+    offline: bool = False,
+    event_callback: Optional[EventCallback] = None,
+    timestamps: Optional[List[Dict[str, Any]]] = None,
+    **_
+) -> Optional[Dict[str, Any]]:
+    """
+    Runs the model-independent stages of transcribe_video (decode and VAD)
+    and returns {'audio', 'timestamps'} to pass back as `prepared`.
+    Returns None when there is nothing to prepare (no VAD, or --stream).
+    `vad` is "silero" or "energy" (see energy_vad). Known `timestamps`
+    (e.g. spans from a journal) skip the VAD.
+    Accepts transcribe_video's keyword arguments and ignores the others.
+    """
+    if not use_vad or stream:
+        return None
+    emit = make_emitter(event_callback, file=video_path)
+
+    # Decode once and share the buffer between VAD and Whisper
+    audio = _decode(video_path, emit)
+    if timestamps is not None:
+        return {"audio": audio, "timestamps": timestamps}
+
+    with stage_timer(emit, "vad", backend=vad) as info:
+        if vad == "energy":
+            from .energy_vad import get_speech_timestamps as energy_timestamps
+            logger.info("Detecting speech segments using energy VAD...")
+            timestamps = energy_timestamps(audio)
+        else:
+            from .vad import get_speech_timestamps
+            logger.info("Detecting speech segments using Silero VAD...")
+            timestamps = get_speech_timestamps(
+                audio, model_dir=vad_model_dir, onnx=vad_onnx, offline=offline
+            )
+        info["segments"] = len(timestamps)
+    return {"audio": audio, "timestamps": timestamps}
+
+
+def _decode(video_path: str, emit: EventCallback) -> np.ndarray:
+    with stage_timer(emit, "decode") as info:
+        audio = load_audio(video_path)
+        info["audio_seconds"] = round(len(audio) / SAMPLE_RATE, 3)
+    return audio
+
+
+def _resolve_language(
+    model,
+    clips: List[np.ndarray],
+    transcribe_options: Dict[str, Any],
+    language_samples: int,
+    emit: EventCallback
+):
+    """
+    Detects the source language once per file from the `language_samples`
+    strongest speech clips and fixes it in transcribe_options, so Whisper
+    doesn't re-detect it (an extra encoder pass) for every segment.
+    Does nothing if the language is already set.
+    """
+    if transcribe_options["language"] is not None or not clips:
+        return
+    with stage_timer(emit, "language_detect", samples=language_samples) as info:
+        language, _ = detect_language(model, pick_samples(clips, language_samples))
+        info["language"] = language
+    transcribe_options["language"] = language
+
+
+def _transcribe_clips(
+    model,
+    clips: List[np.ndarray],
+    transcribe_options: Dict[str, Any]
+) -> List[List[Dict[str, Any]]]:
+    """
+    Transcribes audio clips and returns, per clip, Whisper's segments with
+    times relative to the clip (empty for clips that are too short or
+    silent). More than one clip is decoded as a batch; clips the batched
+    decoder can't reproduce exactly go through model.transcribe instead.
+    """
+    batched = [None] * len(clips)
+    if len(clips) > 1:
+        valid = [j for j, clip in enumerate(clips) if len(clip) >= MIN_SEGMENT_SAMPLES]
+        decoded = decode_batch(
+            model,
+            [clips[j] for j in valid],
+            task=transcribe_options["task"],
+            language=transcribe_options["language"],
+            high_quality="beam_size" in transcribe_options,
+            fp16=transcribe_options["fp16"]
+        )
+        for j, result in zip(valid, decoded):
+            batched[j] = result
+
+    results = []
+    for clip, result in zip(clips, batched):
+        # Skip very short segments (< 0.1s)
+        if len(clip) < MIN_SEGMENT_SAMPLES:
+            results.append([])
+        elif result is not None:
+            results.append(result)
+        else:
+            results.append(model.transcribe(clip, **transcribe_options)['segments'])
+    return results
+
+
+def _clip_text(segments: List[Dict[str, Any]]) -> str:
+    return "".join(s['text'] for s in segments).strip()
+
+
+def _transcribe_timed(
+    model,
+    clips: List[np.ndarray],
+    spans: List[Dict[str, Any]],
+    first_index: int,
+    transcribe_options: Dict[str, Any],
+    emit: EventCallback
+) -> List[List[Dict[str, Any]]]:
+    """
+    Runs _transcribe_clips and emits one 'segment' stage event per clip
+    (batch time is split evenly across a batch). Returns Whisper's segments
+    per clip.
+    """
+    start = time.perf_counter()
+    results = _transcribe_clips(model, clips, transcribe_options)
+    per_clip = (time.perf_counter() - start) / max(1, len(clips))
+
+    for j, (clip, span, segments) in enumerate(zip(clips, spans, results)):
+        emit({
+            "event": "stage",
+            "stage": "segment",
+            "seconds": round(per_clip, 4),
+            "index": first_index + j,
+            "start": round(span['start'], 3),
+            "end": round(span['end'], 3),
+            "audio_seconds": round(len(clip) / SAMPLE_RATE, 3),
+            "tokens": sum(len(s.get('tokens', ())) for s in segments),
+            "batch": len(clips),
+        })
+    return results
+
+
+def _to_subtitles(
+    span: Dict[str, Any],
+    segments: List[Dict[str, Any]],
+    split: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Converts Whisper's segments for one clip into subtitles. By default the
+    clip becomes a single subtitle spanning the VAD segment; with `split`
+    (coalesced windows) each Whisper segment becomes a subtitle, its times
+    offset by the window start and clamped to the window.
+    """
+    if not split:
+        text = _clip_text(segments)
+        return [{'start': span['start'], 'end': span['end'], 'text': text}] if text else []
+
+    subtitles = []
+    for seg in segments:
+        text = seg['text'].strip()
+        if not text:
+            continue
+        subtitles.append({
+            'start': min(span['start'] + seg['start'], span['end']),
+            'end': min(span['start'] + seg['end'], span['end']),
+            'text': text
+        })
+    return subtitles
+
+
+def _transcribe_stream(
+    model,
+    video_path: str,
+    transcribe_options: Dict[str, Any],
+    use_vad: bool,
+    batch_size: int,
+    window_seconds: float,
+    vad_source: Dict[str, Any],
+    language_samples: int,
+    progress: ProgressBus,
+    emit: EventCallback
+) -> Iterator[Dict[str, Any]]:
+    """
+    Bounded-memory variant of iter_transcribe: PCM is read from ffmpeg in
+    chunks and each speech segment is transcribed as soon as the streaming
+    VAD closes it. At most `window_seconds` of audio per pending segment
+    (times batch_size) is held in memory.
+    """
+    chunks = iter_audio_chunks(video_path)
+
+    if not use_vad:
+        # Fixed windows; Whisper's own segment timestamps are offset back
+        # to absolute time
+        window_samples = int(window_seconds * SAMPLE_RATE)
+        offset = 0
+        for i, chunk in enumerate(_rechunk(chunks, window_samples)):
+            progress.check_cancelled()
+            with stage_timer(emit, "segment", index=i, audio_seconds=round(len(chunk) / SAMPLE_RATE, 3)) as info:
+                result = model.transcribe(chunk, **transcribe_options)
+                info["tokens"] = sum(len(s['tokens']) for s in result['segments'])
+            # Reuse the language Whisper detected on the first window
+            transcribe_options["language"] = result["language"]
+            for seg in result['segments']:
+                yield {
+                    'start': offset / SAMPLE_RATE + seg['start'],
+                    'end': offset / SAMPLE_RATE + seg['end'],
+                    'text': seg['text'].strip()
                 }
-                
-                if high_quality:
-                    transcribe_options.update({
-                        "beam_size": 5,
-                        "best_of": 5,
-                        "temperature": 0.0
-                    })
-
-                result = model.transcribe(audio_segment, **transcribe_options)
-
-                text = result['text'].strip()
-                if text:
-                    subtitles.append({
-                        'start': start_sec,
-                        'end': end_sec,
-                        'text': text
-                    })
-
-        return subtitles
-    else:
-        logger.info(f"Transcribing full video with Whisper (task={task})...")
-        transcribe_options = {
-            "task": task,
-            "language": whisper_lang,
-            "fp16": False if device == "cpu" else True
-        }
-        
-        if high_quality:
-            transcribe_options.update({
-                "beam_size": 5,
-                "best_of": 5,
-                "temperature": 0.0
-            })
-
-        result = model.transcribe(video_path, **transcribe_options)
-        return result['segments']
+            offset += len(chunk)
+            progress.advance(video_path, i + 1, offset / SAMPLE_RATE)
+        return
+
+    from .vad import iter_speech_segments
+    logger.info(
+        f"Streaming {video_path} through Silero VAD "
+        f"({window_seconds:.0f}s window, batch size {batch_size})..."
+    )
+
+    pending = []
+    count = 0
+
+    def flush():
+        progress.check_cancelled()
+        _resolve_language(
+            model, [clip for _, _, clip in pending],
+            transcribe_options, language_samples, emit
+        )
+        spans = [{'start': start, 'end': end} for start, end, _ in pending]
+        results = _transcribe_timed(
+            model,
+            [clip for _, _, clip in pending],
+            spans,
+            count - len(pending),
+            transcribe_options,
+            emit
+        )
+        progress.advance(video_path, count, pending[-1][1])
+        pending.clear()
+        return [
+            subtitle
+            for span, segments in zip(spans, results)
+            for subtitle in _to_subtitles(span, segments)
+        ]
+
+    for segment in iter_speech_segments(
+        chunks, max_segment_seconds=window_seconds, **vad_source
+    ):
+        pending.append(segment)
+        count += 1
+        # Until the language is known, hold enough segments to detect it
+        needed = batch_size
+        if transcribe_options["language"] is None:
+            needed = max(batch_size, language_samples)
+        if len(pending) >= needed:
+            yield from flush()
+    if pending:
+        yield from flush()
+
+
+def _rechunk(chunks, size: int):
+    """
+    Regroups a stream of arrays into arrays of exactly `size` samples
+    (the last one may be shorter).
+    """
+    buffer = np.zeros(0, dtype=np.float32)
+    for chunk in chunks:
+        buffer = np.concatenate([buffer, chunk])
+        while len(buffer) >= size:
+            yield buffer[:size]
+            buffer = buffer[size:]
+    if len(buffer):
+        yield buffer
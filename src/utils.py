@@ -1,4 +1,8 @@
+import abc
 import datetime
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
 
 
 def format_timestamp(seconds: float) -> str:
@@ -18,16 +22,162 @@ def format_timestamp(seconds: float) -> str:
     return f"{hours:02}:{minutes:02}:{secs:02},{millis:03}"
 
 
+def format_vtt_timestamp(seconds: float) -> str:
+    """
+    Formats a timestamp in seconds to WebVTT format (HH:MM:SS.mmm).
+    """
+    return format_timestamp(seconds).replace(",", ".")
+
+
+class SubtitleWriter(abc.ABC):
+    """
+    Appends subtitles to a file one at a time, flushing after each so the
+    file can be tailed while a long transcription is still running.
+    Use as a context manager; close() writes any trailer.
+    """
+
+    extension = ""
+
+    def __init__(self, output_path, flush: bool = True):
+        self.path = Path(output_path)
+        self.flush = flush
+        self.count = 0
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(self.header())
+        self._file.flush()
+
+    def header(self) -> str:
+        return ""
+
+    def footer(self) -> str:
+        return ""
+
+    @abc.abstractmethod
+    def format(self, index: int, sub: Dict[str, Any]) -> str:
+        """
+        Returns the text for subtitle number `index` (1-based).
+        """
+
+    def write(self, sub: Dict[str, Any]):
+        self.count += 1
+        self._file.write(self.format(self.count, sub))
+        if self.flush:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write(self.footer())
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SrtWriter(SubtitleWriter):
+    extension = ".srt"
+
+    def format(self, index, sub):
+        start = format_timestamp(sub['start'])
+        end = format_timestamp(sub['end'])
+        text = sub['text'].strip()
+        return f"{index}\n{start} --> {end}\n{text}\n\n"
+
+
+class VttWriter(SubtitleWriter):
+    extension = ".vtt"
+
+    def header(self):
+        return "WEBVTT\n\n"
+
+    def format(self, index, sub):
+        start = format_vtt_timestamp(sub['start'])
+        end = format_vtt_timestamp(sub['end'])
+        text = sub['text'].strip()
+        return f"{start} --> {end}\n{text}\n\n"
+
+
+class JsonWriter(SubtitleWriter):
+    """
+    A JSON array of {"start", "end", "text"} objects, one per line. The
+    array is closed on close(); until then the file holds a valid prefix.
+    """
+
+    extension = ".json"
+
+    def header(self):
+        return "["
+
+    def footer(self):
+        return "\n]\n" if self.count else "]\n"
+
+    def format(self, index, sub):
+        entry = json.dumps(
+            {"start": round(sub['start'], 3), "end": round(sub['end'], 3), "text": sub['text'].strip()},
+            ensure_ascii=False
+        )
+        return f"{',' if index > 1 else ''}\n  {entry}"
+
+
+WRITERS = {
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "json": JsonWriter,
+}
+
+
+class MultiWriter:
+    """
+    Writes each subtitle to several formats side by side in a single pass.
+    """
+
+    def __init__(self, writers: List[SubtitleWriter]):
+        self.writers = writers
+
+    @property
+    def paths(self) -> List[Path]:
+        return [w.path for w in self.writers]
+
+    def write(self, sub: Dict[str, Any]):
+        for writer in self.writers:
+            writer.write(sub)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writers(base_path, formats: Iterable[str]) -> MultiWriter:
+    """
+    Opens one streaming writer per format at base_path with the format's
+    extension (e.g. video.srt, video.vtt, video.json).
+    """
+    base_path = Path(base_path)
+    writers: List[SubtitleWriter] = []
+    try:
+        for name in formats:
+            cls = WRITERS[name]
+            writers.append(cls(base_path.with_suffix(cls.extension)))
+    except Exception:
+        for writer in writers:
+            writer.close()
+        raise
+    return MultiWriter(writers)
+
+
 def write_srt(subtitles, output_path):
     """
     Writes subtitles to an SRT file.
     subtitles: list of dicts with 'start', 'end', 'text'
     """
-    with open(output_path, "w", encoding="utf-8") as f:
-        for i, sub in enumerate(subtitles, start=1):
-            start = format_timestamp(sub['start'])
-            end = format_timestamp(sub['end'])
-            text = sub['text'].strip()
-            f.write(f"{i}\n")
-            f.write(f"{start} --> {end}\n")
-            f.write(f"{text}\n\n")
+    with SrtWriter(output_path, flush=False) as writer:
+        for sub in subtitles:
+            writer.write(sub)
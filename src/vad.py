@@ -1,34 +1,105 @@
 import torch
 import logging
+import numpy as np
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+from .audio import SAMPLE_RATE, load_audio
+from .models import get_registry
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Silero VAD expects 512-sample frames at 16 kHz
+VAD_FRAME_SAMPLES = 512
 
-def get_speech_timestamps(audio_path: str):
+
+SILERO_REPO = 'snakers4/silero-vad'
+
+
+def _cached_hub_dir() -> Optional[Path]:
     """
-    Detects speech segments in an audio file using Silero VAD.
-    Returns a list of dicts with 'start' and 'end' keys in seconds.
+    Returns the torch.hub checkout of silero-vad if one is already on disk.
     """
-    try:
-        # Load Silero VAD model
+    hub_dir = Path(torch.hub.get_dir())
+    for branch in ("master", "main"):
+        candidate = hub_dir / f"snakers4_silero-vad_{branch}"
+        if (candidate / "hubconf.py").exists():
+            return candidate
+    return None
+
+
+def load_silero_vad(
+    model_dir: Optional[str] = None,
+    onnx: bool = False,
+    offline: bool = False
+):
+    """
+    Returns the Silero VAD model and its helper functions, loaded once per
+    process and memoized in the model registry.
+
+    `model_dir` is a local (vendored) silero-vad checkout. Without it, an
+    existing torch.hub checkout is used directly, which skips torch.hub's
+    GitHub resolution. Only if neither exists and `offline` is False is the
+    repository fetched from GitHub. `onnx` selects the ONNX model instead of
+    TorchScript (requires onnxruntime).
+    """
+    source_dir = Path(model_dir) if model_dir else _cached_hub_dir()
+    if source_dir is None and offline:
+        raise RuntimeError(
+            "Offline mode: no local Silero VAD found. Pass --vad-model-dir "
+            "pointing to a silero-vad checkout, or populate the torch.hub "
+            f"cache ({torch.hub.get_dir()}) on a connected machine first."
+        )
+    if source_dir is not None and not (source_dir / "hubconf.py").exists():
+        raise RuntimeError(f"{source_dir} is not a silero-vad checkout (no hubconf.py)")
+
+    def loader():
+        if source_dir is not None:
+            logger.info(f"Loading Silero VAD from {source_dir}...")
+            return torch.hub.load(
+                repo_or_dir=str(source_dir),
+                model='silero_vad',
+                source='local',
+                onnx=onnx
+            )
+        logger.info("Loading Silero VAD from GitHub via torch.hub...")
         # trust_repo=True is important to avoid security warnings/errors
-        model, utils = torch.hub.load(
-            repo_or_dir='snakers4/silero-vad',
+        return torch.hub.load(
+            repo_or_dir=SILERO_REPO,
             model='silero_vad',
             force_reload=False,
-            trust_repo=True
+            trust_repo=True,
+            onnx=onnx
         )
 
-        (get_speech_timestamps_func, _, read_audio, _, _) = utils
+    key = ("silero_vad", str(source_dir or SILERO_REPO), "onnx" if onnx else "jit")
+    return get_registry().get(key, loader)
 
-        logger.info(f"Processing VAD for {audio_path}...")
-        wav = read_audio(audio_path)
+
+def get_speech_timestamps(audio: Union[str, np.ndarray], **vad_source):
+    """
+    Detects speech segments using Silero VAD.
+    `audio` is a 16 kHz float32 buffer (see audio.load_audio) or a file path.
+    `vad_source` is passed to load_silero_vad.
+    Returns a list of dicts with 'start' and 'end' keys in seconds.
+    """
+    try:
+        # Load Silero VAD model
+        model, utils = load_silero_vad(**vad_source)
+
+        (get_speech_timestamps_func, _, _, _, _) = utils
+
+        if isinstance(audio, str):
+            audio = load_audio(audio)
+
+        logger.info("Processing VAD...")
+        # from_numpy shares memory with the decoded buffer (no copy)
+        wav = torch.from_numpy(audio)
 
         # get_speech_timestamps returns a list of dicts:
         # [{'start': 0.5, 'end': 1.2}, ...]
         speech_timestamps = get_speech_timestamps_func(
-            wav, model, return_seconds=True
+            wav, model, sampling_rate=SAMPLE_RATE, return_seconds=True
         )
 
         logger.info(f"Found {len(speech_timestamps)} speech segments.")
@@ -36,3 +107,81 @@ def get_speech_timestamps(audio_path: str):
     except Exception as e:
         logger.error(f"Error in VAD processing: {e}")
         raise
+
+
+def iter_speech_segments(
+    chunks: Iterable[np.ndarray],
+    max_segment_seconds: float = 30.0,
+    **vad_source
+) -> Iterator[Tuple[float, float, np.ndarray]]:
+    """
+    Runs Silero's streaming VADIterator over PCM chunks (see
+    audio.iter_audio_chunks) and yields (start, end, audio) for each speech
+    segment as soon as it closes. Times are in seconds.
+
+    Only the current segment is buffered; segments longer than
+    `max_segment_seconds` are cut and emitted in pieces, which bounds memory
+    regardless of the input length.
+    """
+    model, utils = load_silero_vad(**vad_source)
+    (_, _, _, VADIterator, _) = utils
+    vad_iterator = VADIterator(model, sampling_rate=SAMPLE_RATE)
+
+    max_samples = int(max_segment_seconds * SAMPLE_RATE)
+    # VADIterator reports starts slightly in the past (speech padding), so a
+    # short lookback of audio is kept while no segment is open
+    lookback = SAMPLE_RATE
+
+    # Preallocated buffer, compacted only when full
+    capacity = 2 * (max_samples + lookback) + VAD_FRAME_SAMPLES
+    buffer = np.empty(capacity, dtype=np.float32)
+    buffer_len = 0
+    buffer_start = 0       # absolute sample index of buffer[0]
+    segment_start = None   # absolute sample index, None when not in speech
+    pending = np.zeros(0, dtype=np.float32)
+    position = 0           # absolute sample index of the next frame
+
+    def take(start: int, end: int) -> np.ndarray:
+        return buffer[max(0, start - buffer_start):end - buffer_start].copy()
+
+    try:
+        for chunk in chunks:
+            pending = np.concatenate([pending, chunk])
+            n_frames = len(pending) // VAD_FRAME_SAMPLES
+            for k in range(n_frames):
+                frame = pending[k * VAD_FRAME_SAMPLES:(k + 1) * VAD_FRAME_SAMPLES]
+
+                if buffer_len + VAD_FRAME_SAMPLES > capacity:
+                    # Drop everything the open segment (or lookback) no longer needs
+                    keep_from = segment_start if segment_start is not None else position - lookback
+                    shift = max(0, keep_from - buffer_start)
+                    buffer[:buffer_len - shift] = buffer[shift:buffer_len]
+                    buffer_len -= shift
+                    buffer_start += shift
+
+                buffer[buffer_len:buffer_len + VAD_FRAME_SAMPLES] = frame
+                buffer_len += VAD_FRAME_SAMPLES
+                position += VAD_FRAME_SAMPLES
+
+                event = vad_iterator(torch.from_numpy(frame))
+                if event and 'start' in event:
+                    segment_start = max(int(event['start']), buffer_start)
+                elif event and 'end' in event and segment_start is not None:
+                    end = min(int(event['end']), position)
+                    if end > segment_start:
+                        yield (segment_start / SAMPLE_RATE, end / SAMPLE_RATE,
+                               take(segment_start, end))
+                    segment_start = None
+
+                if segment_start is not None and position - segment_start >= max_samples:
+                    # Cut over-long speech so the buffer stays bounded
+                    yield (segment_start / SAMPLE_RATE, position / SAMPLE_RATE,
+                           take(segment_start, position))
+                    segment_start = position
+            pending = pending[n_frames * VAD_FRAME_SAMPLES:]
+
+        if segment_start is not None and position > segment_start:
+            yield (segment_start / SAMPLE_RATE, position / SAMPLE_RATE,
+                   take(segment_start, position))
+    finally:
+        vad_iterator.reset_states()
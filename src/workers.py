@@ -0,0 +1,150 @@
+import logging
+import multiprocessing
+import os
+import signal
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .progress import Cancelled, ProgressBus
+
+logger = logging.getLogger(__name__)
+
+# Set by run_parallel's parent to stop every worker after its current batch
+_cancel_event = None
+# This worker's RSS sampler, with track_memory
+_tracker = None
+
+
+def _init_worker(
+    num_threads: int,
+    options: Dict[str, Any],
+    cancel_event=None,
+    track_memory: bool = False
+):
+    """
+    Runs once in each worker process: limits torch's intra-op threads to the
+    worker's share of the cores and warms the Whisper model. Ctrl+C is left
+    to the parent, which cancels through `cancel_event`. With
+    `track_memory`, the worker samples its own RSS (see _run_job).
+    """
+    global _cancel_event, _tracker
+    _cancel_event = cancel_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if track_memory:
+        from .memory import MemoryTracker
+        _tracker = MemoryTracker().start()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    import torch
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+
+    from .models import load_whisper_model
+    load_whisper_model(
+        options["model_size"],
+        device="cpu" if options.get("quantize") else None,
+        precision=options.get("quantize"),
+        offline=options.get("offline", False)
+    )
+
+
+def _run_job(
+    file_path: Path,
+    output_dir: Optional[Path],
+    options: Dict[str, Any],
+    collect_events: bool
+) -> Tuple[Path, List[Dict[str, Any]]]:
+    from .main import process_file
+    from .memory import release_memory
+    # Callbacks can't cross the process boundary; events are collected
+    # here and returned with the result. The tracker annotates them with
+    # this process's peak RSS first.
+    events: List[Dict[str, Any]] = []
+    collect = ProgressBus().subscribe(_tracker).subscribe(events.append) if collect_events else None
+    try:
+        srt_path = process_file(
+            file_path, output_dir,
+            event_callback=collect,
+            # No subscribers: workers draw no progress bars, only check for cancel
+            progress=ProgressBus(cancel_event=_cancel_event),
+            **options
+        )
+    finally:
+        # The next job starts from a trimmed heap
+        release_memory()
+    return srt_path, events
+
+
+def run_parallel(
+    files: List[Path],
+    workers: int,
+    output_dir: Optional[Path],
+    options: Dict[str, Any],
+    event_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    overrides: Optional[Dict[Path, Dict[str, Any]]] = None,
+    progress: Optional[ProgressBus] = None,
+    track_memory: bool = False
+) -> List[Path]:
+    """
+    Transcribes files in a pool of `workers` processes, each keeping a warm
+    model. A failure in one file is logged and does not stop the others.
+    Files are submitted in the given order; pass them longest first (see
+    discovery.build_manifest) so workers finish at about the same time.
+    Stage events from the workers are forwarded to `event_callback`.
+    `overrides` maps files to options replacing `options` for that file.
+    Cancelling `progress` drops the files not yet started and stops the
+    running ones after their current batch (journals kept for --resume).
+    With `track_memory`, stage events carry the worker's 'peak_rss_mb'.
+    Returns the paths of the written SRT files.
+    """
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    jobs = list(files)
+    logger.info(
+        f"Processing {len(jobs)} files with {workers} workers "
+        f"({num_threads} threads each)..."
+    )
+
+    # spawn avoids forking a process that may already hold torch threads
+    ctx = multiprocessing.get_context("spawn")
+    cancel_event = ctx.Event()
+    written = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(num_threads, options, cancel_event, track_memory)
+    ) as pool:
+        futures = {
+            pool.submit(
+                _run_job, file_path, output_dir,
+                dict(options, **(overrides or {}).get(file_path, {})),
+                event_callback is not None
+            ): file_path
+            for file_path in jobs
+        }
+        pending = set(futures)
+        while pending:
+            # Wake up regularly to notice a cancellation
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            if progress is not None and progress.cancelled and not cancel_event.is_set():
+                cancel_event.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+            for future in done:
+                file_path = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    srt_path, events = future.result()
+                    for event in events:
+                        event_callback(event)
+                    print(f"Saved subtitles to {srt_path}")  # Force print to stdout
+                    logger.info(f"Saved subtitles to {srt_path}")
+                    written.append(srt_path)
+                except Cancelled:
+                    logger.warning(f"Cancelled while processing {file_path}")
+                except Exception as e:
+                    logger.error(f"Failed to process {file_path}: {e}")
+    return written
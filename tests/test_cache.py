@@ -0,0 +1,76 @@
+import os
+import time
+
+from src.cache import TranscriptCache, hash_file, relevant_options
+
+OPTIONS = {"model_size": "base", "stream": False, "coalesce": False, "batch_size": 1}
+SUBS = [{"start": 0.0, "end": 1.0, "text": "hello", "extra": 1}]
+
+
+def media(tmp_path, name="a.mp4", data=b"media"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+def test_relevant_options():
+    options = dict(OPTIONS, stream_window=30, max_gap=1.0, segment_padding=0.2, max_window=30, offline=True)
+    assert relevant_options(options) == {"model_size": "base", "stream": False, "coalesce": False}
+    active = dict(options, stream=True, coalesce=True)
+    assert set(relevant_options(active)) == {
+        "model_size", "stream", "coalesce", "stream_window", "max_gap", "segment_padding", "max_window"
+    }
+
+
+def test_key_ignores_neutral_and_inactive_options(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache")
+    path = media(tmp_path)
+    key = cache.key_for(path, dict(OPTIONS, stream_window=30))
+    # --max-memory only changed the (unused) stream window and batch size
+    assert cache.key_for(path, dict(OPTIONS, stream_window=12.5, batch_size=4)) == key
+    assert cache.key_for(path, dict(OPTIONS, stream=True, stream_window=30)) != key
+    assert cache.key_for(path, dict(OPTIONS, model_size="small")) != key
+
+
+def test_key_follows_content_not_path(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache")
+    first, copy = media(tmp_path, "a.mp4"), media(tmp_path, "b.mp4")
+    assert cache.key_for(first, OPTIONS) == cache.key_for(copy, OPTIONS)
+    first.write_bytes(b"changed")
+    assert cache.key_for(first, OPTIONS) != cache.key_for(copy, OPTIONS)
+    assert cache.content_hash(first) == hash_file(first)
+
+
+def test_put_and_get(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache")
+    key = cache.key_for(media(tmp_path), OPTIONS)
+    assert cache.get(key) is None
+    cache.put(key, SUBS)
+    assert cache.get(key) == [{"start": 0.0, "end": 1.0, "text": "hello"}]
+
+
+def test_lru_eviction(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache", max_size_mb=1)
+    text = "x" * 300_000
+    now = time.time()
+    for i, key in enumerate("abc"):
+        cache.put(key, [{"start": 0.0, "end": 1.0, "text": text}])
+        os.utime(cache.entries_dir / f"{key}.json", (now - 100 + i, now - 100 + i))
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") is not None
+    cache.put("d", [{"start": 0.0, "end": 1.0, "text": text}])
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+
+
+def test_stale_hash_memos_are_pruned(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache")
+    kept, deleted, changed = (media(tmp_path, name) for name in ("a.mp4", "b.mp4", "c.mp4"))
+    for path in (kept, deleted, changed):
+        cache.content_hash(path)
+    assert len(list(cache.hashes_dir.glob("*.json"))) == 3
+    deleted.unlink()
+    changed.write_bytes(b"other content")
+    cache.put("key", SUBS)
+    assert len(list(cache.hashes_dir.glob("*.json"))) == 1
+    assert cache.content_hash(changed) == hash_file(changed)
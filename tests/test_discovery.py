@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from src import discovery
+from src.discovery import build_manifest, expand_duplicates, iter_media_files, parse_shard, shard_entries
+
+
+def entry(name, duration, size=100):
+    return {"path": f"/media/{name}", "size": size, "duration": duration}
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    assert parse_shard("1/1") == (1, 1)
+    for value in ("0/3", "3/2", "a/b", "1", "1/2/3", "1/0"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_shard_entries_partition():
+    entries = [entry(f"f{i}.mp4", duration) for i, duration in enumerate([50, 40, 30, 30, 20, 10, 5, 0])]
+    shards = [shard_entries(entries, i, 3) for i in range(1, 4)]
+    paths = [e["path"] for shard in shards for e in shard]
+    assert sorted(paths) == sorted(e["path"] for e in entries)
+    assert len(paths) == len(set(paths))
+
+
+def test_shard_entries_balance_by_duration():
+    entries = [entry("long.mp4", 100)] + [entry(f"short{i}.mp4", 10) for i in range(10)]
+    first, second = shard_entries(entries, 1, 2), shard_entries(entries, 2, 2)
+    # One long file against all the short ones, not an even file count
+    assert [e["path"] for e in first] == ["/media/long.mp4"]
+    assert len(second) == 10
+    assert first == sorted(first, key=lambda e: -e["duration"])
+
+
+def test_shard_entries_ignore_input_order():
+    entries = [entry(f"f{i}.mp4", duration) for i, duration in enumerate([7, 3, 3, 9, 1, 4])]
+    for i in range(1, 4):
+        assert shard_entries(entries, i, 3) == shard_entries(list(reversed(entries)), i, 3)
+
+
+def touch(path, data=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_iter_media_files(tmp_path):
+    top = touch(tmp_path / "a.MP4")
+    nested = touch(tmp_path / "sub" / "b.wav")
+    touch(tmp_path / "notes.txt")
+    assert set(iter_media_files(tmp_path)) == {top}
+    assert set(iter_media_files(tmp_path, recursive=True)) == {top, nested}
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_iter_media_files_skips_symlinked_dirs(tmp_path):
+    media = touch(tmp_path / "real" / "a.mp3")
+    os.symlink(tmp_path / "real", tmp_path / "link", target_is_directory=True)
+    # A link cycle must not recurse forever either
+    os.symlink(tmp_path, tmp_path / "real" / "loop", target_is_directory=True)
+    assert list(iter_media_files(tmp_path, recursive=True)) == [media]
+
+
+@pytest.fixture
+def durations(monkeypatch):
+    # ffprobe may not be installed; durations are not under test here
+    monkeypatch.setattr(discovery, "probe_duration", lambda path: 1.0)
+
+
+def test_build_manifest_dedupe(tmp_path, durations):
+    first = touch(tmp_path / "a.mp4", b"same")
+    second = touch(tmp_path / "b.mp4", b"same")
+    other = touch(tmp_path / "c.mp4", b"diff")
+    manifest = build_manifest([tmp_path])
+    files = {e["path"]: e for e in manifest["files"]}
+    assert set(files) == {str(first.resolve()), str(other.resolve())}
+    assert files[str(first.resolve())]["duplicates"] == [str(second.resolve())]
+    # Sizes match, so the distinct file is hashed too
+    assert files[str(other.resolve())]["sha256"] is not None
+
+
+def test_build_manifest_without_dedupe(tmp_path, durations):
+    touch(tmp_path / "a.mp4", b"same")
+    touch(tmp_path / "b.mp4", b"same")
+    manifest = build_manifest([tmp_path, tmp_path / "a.mp4"], dedupe=False)
+    # Each path once, but copies of the same content are kept
+    assert len(manifest["files"]) == 2
+    assert all(e["sha256"] is None and e["duplicates"] == [] for e in manifest["files"])
+
+
+def test_expand_duplicates(tmp_path, durations):
+    first = touch(tmp_path / "a.mp4", b"same")
+    second = touch(tmp_path / "b.mp4", b"same")
+    other = touch(tmp_path / "c.mp4", b"diff")
+    entries = expand_duplicates(build_manifest([tmp_path])["files"])
+    paths = [e["path"] for e in entries]
+    # Every path once, each copy right after the file it duplicates
+    assert sorted(paths) == sorted(str(f.resolve()) for f in (first, second, other))
+    assert paths.index(str(second.resolve())) == paths.index(str(first.resolve())) + 1
+    assert all(e["duplicates"] == [] for e in entries if e["path"] != str(first.resolve()))
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.audio import SAMPLE_RATE
+from src.energy_vad import get_speech_timestamps
+
+
+def make_audio(seconds, tones=()):
+    """
+    Faint noise with 200 Hz tones as (start, end, amplitude) bursts.
+    """
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-1e-3, 1e-3, int(seconds * SAMPLE_RATE))
+    t = np.arange(len(audio)) / SAMPLE_RATE
+    for start, end, amplitude in tones:
+        burst = (t >= start) & (t < end)
+        audio[burst] += amplitude * np.sin(2 * np.pi * 200 * t[burst])
+    return audio.astype(np.float32)
+
+
+def spans(timestamps):
+    return [(s["start"], s["end"]) for s in timestamps]
+
+
+def test_all_silence():
+    assert get_speech_timestamps(np.zeros(5 * SAMPLE_RATE, dtype=np.float32)) == []
+    assert get_speech_timestamps(make_audio(5)) == []
+
+
+def test_padding():
+    audio = make_audio(4, [(1.0, 2.0, 0.1)])
+    (start, end), = spans(get_speech_timestamps(audio, speech_pad_seconds=0.0))
+    assert start == pytest.approx(1.0, abs=0.03) and end == pytest.approx(2.0, abs=0.03)
+    (padded_start, padded_end), = spans(get_speech_timestamps(audio, speech_pad_seconds=0.2))
+    assert padded_start == pytest.approx(start - 0.2, abs=1e-3)
+    assert padded_end == pytest.approx(end + 0.2, abs=1e-3)
+
+
+def test_padding_is_clipped_to_audio():
+    audio = make_audio(2.2, [(0.1, 1.9, 0.1)])
+    (start, end), = spans(get_speech_timestamps(audio, speech_pad_seconds=0.5))
+    assert start == 0.0 and end == pytest.approx(2.2)
+
+
+def test_short_gaps_are_bridged():
+    audio = make_audio(6, [(1.0, 2.0, 0.1), (2.15, 3.0, 0.1), (4.0, 5.0, 0.1)])
+    result = spans(get_speech_timestamps(audio, min_silence_seconds=0.3, speech_pad_seconds=0.0))
+    assert len(result) == 2
+    assert result[0][0] == pytest.approx(1.0, abs=0.03) and result[0][1] == pytest.approx(3.0, abs=0.03)
+    assert len(get_speech_timestamps(audio, min_silence_seconds=0.1, speech_pad_seconds=0.0)) == 3
+
+
+def test_hysteresis():
+    # A loud onset carries its quieter tail; the same quiet level alone is not speech
+    loud, quiet = 0.1, 0.003
+    audio = make_audio(7, [(1.0, 1.5, loud), (1.5, 3.0, quiet), (4.5, 6.0, quiet)])
+    (start, end), = spans(get_speech_timestamps(audio, speech_pad_seconds=0.0))
+    assert start == pytest.approx(1.0, abs=0.03) and end == pytest.approx(3.0, abs=0.03)
+
+
+def test_short_bursts_are_dropped():
+    audio = make_audio(3, [(1.0, 1.1, 0.1)])
+    assert get_speech_timestamps(audio, min_speech_seconds=0.25) == []
@@ -0,0 +1,78 @@
+import json
+
+from src.journal import Journal, fingerprint, journal_path, read_journal
+
+SPANS = [{"start": 0.0, "end": 2.0}, {"start": 3.0, "end": 5.0}]
+SUBS = [{"start": 0.5, "end": 1.5, "text": "hello"}]
+
+
+def make_journal(tmp_path, header):
+    journal = Journal(tmp_path / "video.journal.jsonl", header)
+    journal.record_spans(SPANS)
+    journal.record_language("de")
+    journal.record_segment(0, SUBS)
+    journal.close()
+    return journal.path
+
+
+def test_journal_path():
+    assert journal_path("out/video.srt").name == "video.journal.jsonl"
+
+
+def test_fingerprint_ignores_neutral_options(tmp_path):
+    media = tmp_path / "video.mp4"
+    media.write_bytes(b"data")
+    assert fingerprint(media, {"model_size": "base", "batch_size": 1}) == \
+        fingerprint(media, {"model_size": "base", "batch_size": 8})
+    assert fingerprint(media, {"model_size": "base"}) != fingerprint(media, {"model_size": "small"})
+
+
+def test_resume_replays_records(tmp_path):
+    path = make_journal(tmp_path, {"job": 1})
+    journal = Journal(path, {"job": 1}, resume=True)
+    assert journal.spans == SPANS
+    assert journal.language == "de"
+    assert journal.segments == {0: SUBS}
+    journal.record_segment(1, [])
+    journal.close()
+    assert read_journal(path, {"job": 1})["segments"] == {0: SUBS, 1: []}
+
+
+def test_header_mismatch_starts_over(tmp_path):
+    path = make_journal(tmp_path, {"job": 1})
+    assert read_journal(path, {"job": 2}) is None
+    journal = Journal(path, {"job": 2}, resume=True)
+    journal.close()
+    assert journal.spans is None and journal.segments == {}
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"type": "header", "job": 2}]
+
+
+def test_without_resume_starts_over(tmp_path):
+    path = make_journal(tmp_path, {"job": 1})
+    Journal(path, {"job": 1}).close()
+    assert read_journal(path, {"job": 1})["spans"] is None
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = make_journal(tmp_path, {"job": 1})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "segment", "index": 1, "subt')
+    journal = Journal(path, {"job": 1}, resume=True)
+    assert journal.segments == {0: SUBS}
+    journal.record_segment(1, SUBS)
+    journal.close()
+    # The torn tail was cut, so the new record is on a line of its own
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records[-1] == {"type": "segment", "index": 1, "subtitles": SUBS}
+    assert len(records) == 5
+
+
+def test_missing_journal(tmp_path):
+    assert read_journal(tmp_path / "none.journal.jsonl", {"job": 1}) is None
+
+
+def test_remove(tmp_path):
+    path = make_journal(tmp_path, {"job": 1})
+    Journal(path, {"job": 1}, resume=True).remove()
+    assert not path.exists()
@@ -0,0 +1,63 @@
+import pytest
+
+from src import memory
+from src.memory import MB, MemoryTracker, estimate_model_mb, plan_memory
+
+
+def plan(max_memory_mb, model_size="large-v3-turbo", quantize="int8", batch_size=8, workers=1):
+    return plan_memory(
+        max_memory_mb, model_size, quantize, "cpu", batch_size,
+        stream_window=30, prefetch_memory_mb=512, workers=workers
+    )
+
+
+def test_small_model_keeps_batch_size():
+    assert plan(3000, "base.en", None)["batch_size"] == 8
+
+
+def test_batch_size_shrinks_to_fit():
+    shrunk = plan(8000)
+    assert 1 <= shrunk["batch_size"] < 8
+    # Batches take at most half of what the model and runtime leave
+    available = 8000 - memory.RUNTIME_MB - estimate_model_mb("large-v3-turbo", "int8", "cpu")
+    assert shrunk["batch_size"] * memory.BATCH_ITEM_MB["turbo"] <= available / 2
+    assert plan(16000)["batch_size"] > shrunk["batch_size"]
+
+
+def test_audio_budget_caps_prefetch_and_decode():
+    tight = plan(1500, "tiny", None)
+    assert tight["prefetch_memory_mb"] < 512
+    assert tight["max_decode_seconds"] < plan(3000, "tiny", None)["max_decode_seconds"]
+
+
+def test_model_that_cannot_fit_raises():
+    with pytest.raises(MemoryError, match="budget is 4000 MB"):
+        plan(4000)
+
+
+def test_budget_is_split_across_workers():
+    assert plan(16000, workers=2) == plan(8000)
+    with pytest.raises(MemoryError, match="per worker"):
+        plan(8000, workers=2)
+
+
+def test_model_aliases():
+    assert plan(8000, "turbo") == plan(8000, "large-v3-turbo")
+    assert plan(3000, "base", None) == plan(3000, "base.en", None)
+    with pytest.raises(ValueError, match="unknown model size"):
+        plan(8000, "huge")
+
+
+def test_peak_since(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(memory.time, "perf_counter", lambda: next(clock))
+    readings = iter([5, 9, 3, 4, 2, 1, 1])
+    monkeypatch.setattr(memory, "current_rss", lambda: next(readings) * MB)
+    tracker = MemoryTracker()
+    for _ in range(4):
+        tracker._sample()
+    # Samples at t=0..3 were 5, 9, 3, 4; each call samples once more
+    assert tracker.peak_since(0) == 9 * MB
+    assert tracker.peak_since(2) == 4 * MB
+    assert tracker.peak_since(50) == 1 * MB
+    assert tracker.peak == 9 * MB
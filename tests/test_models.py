@@ -0,0 +1,106 @@
+import threading
+import time
+
+import numpy as np
+
+from src.models import ModelRegistry, model_memory_bytes
+
+MB = 1024 ** 2
+
+
+class FakeModel:
+    """
+    Looks like a torch module to model_memory_bytes: a state dict of
+    arrays with numel()/element_size().
+    """
+
+    class Tensor:
+        def __init__(self, nbytes):
+            self.data = np.zeros(nbytes, dtype=np.uint8)
+
+        def numel(self):
+            return self.data.size
+
+        def element_size(self):
+            return self.data.itemsize
+
+    def __init__(self, mb):
+        self._state = {"weight": self.Tensor(int(mb * MB))}
+
+    def state_dict(self):
+        return self._state
+
+
+def test_model_memory_bytes():
+    assert model_memory_bytes(FakeModel(2)) == 2 * MB
+    # torch.hub returns (model, helpers)
+    assert model_memory_bytes((FakeModel(1), object())) == MB
+    assert model_memory_bytes(object()) == 0
+
+
+def test_hits_and_misses():
+    registry = ModelRegistry()
+    first = registry.get("a", lambda: FakeModel(1))
+    assert registry.get("a", lambda: FakeModel(1)) is first
+    assert (registry.hits, registry.misses) == (1, 1)
+    assert registry.memory_bytes() == MB
+
+
+def test_lru_eviction_under_budget():
+    registry = ModelRegistry(memory_budget_mb=2.5)
+    registry.get("a", lambda: FakeModel(1))
+    registry.get("b", lambda: FakeModel(1))
+    # Touch "a" so that "b" is the least recently used
+    registry.get("a", lambda: FakeModel(1))
+    registry.get("c", lambda: FakeModel(1))
+    assert registry.contains("a") and registry.contains("c")
+    assert not registry.contains("b")
+    assert registry.evictions == 1
+    assert registry.stats()["cached_models"] == ["a", "c"]
+
+
+def test_new_model_is_kept_even_over_budget():
+    registry = ModelRegistry(memory_budget_mb=1)
+    registry.get("small", lambda: FakeModel(0.5))
+    registry.get("big", lambda: FakeModel(3))
+    assert registry.stats()["cached_models"] == ["big"]
+
+
+def test_lowering_the_budget_evicts():
+    registry = ModelRegistry()
+    for key in "abc":
+        registry.get(key, lambda: FakeModel(1))
+    registry.set_memory_budget(1)
+    assert registry.stats()["cached_models"] == ["c"]
+
+
+def test_evict_and_clear():
+    registry = ModelRegistry()
+    registry.get("a", lambda: FakeModel(1))
+    registry.get("b", lambda: FakeModel(1))
+    assert registry.evict("a") and not registry.evict("a")
+    registry.clear()
+    assert registry.memory_bytes() == 0 and registry.evictions == 2
+
+
+def test_concurrent_requests_load_once():
+    registry = ModelRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return FakeModel(0.1)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("a", loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert (registry.misses, registry.hits) == (1, 7)
@@ -0,0 +1,103 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.pipeline import PrefetchPipeline
+
+FILES = [Path(f"f{i}.wav") for i in range(6)]
+
+
+class Recorder:
+    """
+    prepare() stub that records which files were started.
+    """
+
+    def __init__(self, fail=()):
+        self.started = []
+        self.fail = set(fail)
+
+    def __call__(self, path):
+        self.started.append(path)
+        if path in self.fail:
+            raise RuntimeError(f"cannot decode {path}")
+        return f"audio of {path}"
+
+
+def settle():
+    # Give the producer thread time to run as far ahead as it may
+    time.sleep(0.05)
+
+
+def test_yields_every_file_in_order():
+    prepare = Recorder()
+    results = list(PrefetchPipeline(FILES, prepare))
+    assert results == [(f, f"audio of {f}", None) for f in FILES]
+
+
+@pytest.mark.parametrize("max_ahead", [0, 1, 3])
+def test_max_ahead(max_ahead):
+    prepare = Recorder()
+    ahead = []
+    for i, _ in enumerate(PrefetchPipeline(FILES, prepare, max_ahead=max_ahead)):
+        settle()
+        ahead.append(len(prepare.started) - (i + 1))
+    assert max(ahead) == max_ahead
+    assert ahead[-1] == 0
+
+
+def test_max_bytes():
+    sizes = {f: 6 for f in FILES}
+    prepare = Recorder()
+    ahead = []
+    jobs = PrefetchPipeline(FILES, prepare, max_ahead=5, max_bytes=13, estimate=sizes.get)
+    for i, _ in enumerate(jobs):
+        settle()
+        ahead.append(len(prepare.started) - (i + 1))
+    # The current file (6) plus one more (12) fit under 13, a third doesn't
+    assert max(ahead) == 1
+
+
+def test_oversized_file_is_still_prepared():
+    sizes = {FILES[0]: 100, FILES[1]: 1}
+    prepare = Recorder()
+    jobs = PrefetchPipeline(FILES[:2], prepare, max_bytes=10, estimate=sizes.get)
+    first = next(iter(jobs))
+    settle()
+    # Alone it may exceed the budget; nothing else is decoded meanwhile
+    assert first[0] == FILES[0] and prepare.started == [FILES[0]]
+
+
+def test_errors_are_passed_through():
+    prepare = Recorder(fail=[FILES[1]])
+    results = list(PrefetchPipeline(FILES[:3], prepare))
+    assert [r[0] for r in results] == FILES[:3]
+    assert isinstance(results[1][2], RuntimeError) and results[1][1] is None
+    assert results[2][2] is None
+
+
+def test_stops_when_consumer_breaks():
+    prepare = Recorder()
+    for _ in PrefetchPipeline(FILES, prepare, max_ahead=1):
+        break
+    settle()
+    assert len(prepare.started) <= 2
+    assert not any(t.name == "prefetch" and t.is_alive() for t in threading.enumerate())
+
+
+def test_exclusive_files_pause_prefetch():
+    sizes = {f: 6 for f in FILES}
+    prepare = Recorder()
+    jobs = PrefetchPipeline(
+        FILES[:4], prepare, max_ahead=3, max_bytes=13, estimate=sizes.get, exclusive={FILES[1]}
+    )
+    seen = []
+    for path, prepared, error in jobs:
+        settle()
+        seen.append((path, prepared, list(prepare.started)))
+    # The exclusive file is left to the caller and reserves no bytes
+    assert seen[1][1] is None and FILES[1] not in prepare.started
+    # Nothing past it is prepared while it is being consumed
+    assert seen[1][2] == [FILES[0]]
+    assert [s[0] for s in seen] == FILES[:4]
@@ -0,0 +1,132 @@
+import multiprocessing
+
+import pytest
+
+from src import progress
+from src.progress import Cancelled, ProgressBus, format_eta
+
+
+class Clock:
+    """
+    Stand-in for time.perf_counter that only moves when told to.
+    """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(progress.time, "perf_counter", clock)
+    return clock
+
+
+def make_bus(min_interval=1.0):
+    events = []
+    return ProgressBus(min_interval=min_interval).subscribe(events.append), events
+
+
+def test_progress_is_throttled_per_file(clock):
+    bus, events = make_bus()
+    bus.start("a.wav", total=10, audio_seconds=100)
+    bus.start("b.wav", total=10, audio_seconds=100)
+
+    bus.advance("a.wav", 1, 10)
+    bus.advance("a.wav", 2, 20)
+    bus.advance("b.wav", 1, 10)
+    clock.now += 0.5
+    bus.advance("a.wav", 3, 30)
+    clock.now += 0.6
+    bus.advance("a.wav", 4, 40)
+
+    assert [(e["file"], e["current"]) for e in events] == [
+        ("a.wav", 1), ("b.wav", 1), ("a.wav", 4),
+    ]
+
+
+def test_final_progress_is_always_sent(clock):
+    bus, events = make_bus()
+    bus.start("a.wav", total=3, audio_seconds=30)
+    bus.advance("a.wav", 1, 10)
+    bus.advance("a.wav", 3, 30)
+    assert [e["current"] for e in events] == [1, 3]
+
+
+def test_finish_marks_done_and_forgets_file(clock):
+    bus, events = make_bus()
+    bus.start("a.wav", total=0, audio_seconds=0)
+    bus.finish("a.wav")
+    assert events[-1]["done"] is True
+    # Further reports for a finished file are dropped
+    bus.advance("a.wav", 1, 10)
+    bus.finish("a.wav")
+    assert len(events) == 1
+
+
+def test_stage_events_pass_through_unthrottled():
+    bus, events = make_bus()
+    bus({"event": "stage", "stage": "vad"})
+    bus({"event": "stage", "stage": "transcribe"})
+    assert len(events) == 2
+
+
+def test_eta_from_real_time_factor(clock):
+    bus, events = make_bus()
+    bus.start("a.wav", total=10, audio_seconds=100)
+    clock.now += 5
+    bus.advance("a.wav", 2, 20)
+    event = events[-1]
+    assert event["rtf"] == 0.25
+    assert event["eta"] == 20.0
+
+
+def test_skipped_audio_is_left_out_of_the_rate(clock):
+    bus, events = make_bus(min_interval=0)
+    bus.start("a.wav", total=10, audio_seconds=100)
+    bus.advance("a.wav", 5, 50, skipped=True)
+    assert events[-1]["rtf"] is None
+    assert events[-1]["eta"] is None
+    clock.now += 10
+    bus.advance("a.wav", 6, 60)
+    assert events[-1]["rtf"] == 1.0
+    assert events[-1]["eta"] == 40.0
+
+
+def test_unknown_length_has_no_eta(clock):
+    bus, events = make_bus()
+    bus.start("a.wav", total=0)
+    clock.now += 1
+    bus.advance("a.wav", 1, 10)
+    assert events[-1]["eta"] is None
+
+
+def test_cancel_raises_on_check():
+    bus = ProgressBus()
+    bus.check_cancelled()
+    bus.cancel()
+    assert bus.cancelled
+    with pytest.raises(Cancelled):
+        bus.check_cancelled()
+
+
+def test_shared_cancel_event():
+    event = multiprocessing.Event()
+    bus = ProgressBus(cancel_event=event)
+    event.set()
+    assert bus.cancelled
+
+
+@pytest.mark.parametrize("seconds, expected", [
+    (None, "--:--"),
+    (0, "00:00"),
+    (59.6, "01:00"),
+    (754, "12:34"),
+    (3600, "1:00:00"),
+    (3725, "1:02:05"),
+])
+def test_format_eta(seconds, expected):
+    assert format_eta(seconds) == expected
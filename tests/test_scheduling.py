@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.audio import SAMPLE_RATE
+from src.scheduling import schedule_windows, split_at_low_energy
+
+
+def make_audio(seconds, quiet=()):
+    """
+    Constant-level noise with near-silent (start, end) spans.
+    """
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for start, end in quiet:
+        audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] *= 0.001
+    return audio
+
+
+def test_split_short_span_is_untouched():
+    audio = make_audio(10)
+    assert split_at_low_energy(audio, 1.0, 9.0, 30.0) == [{"start": 1.0, "end": 9.0}]
+
+
+def test_split_cuts_at_quiet_frame():
+    audio = make_audio(40, quiet=[(22.0, 22.1)])
+    pieces = split_at_low_energy(audio, 0.0, 40.0, 30.0)
+    assert len(pieces) == 2
+    assert 22.0 <= pieces[0]["end"] <= 22.1
+    assert pieces[1] == {"start": pieces[0]["end"], "end": 40.0}
+
+
+def test_split_pieces_are_contiguous_and_bounded():
+    audio = make_audio(100)
+    pieces = split_at_low_energy(audio, 0.0, 100.0, 10.0)
+    assert pieces[0]["start"] == 0.0 and pieces[-1]["end"] == 100.0
+    for a, b in zip(pieces, pieces[1:]):
+        assert a["end"] == b["start"]
+    assert all(p["end"] - p["start"] <= 10.0 for p in pieces)
+
+
+def test_schedule_merges_close_segments():
+    audio = make_audio(20)
+    timestamps = [{"start": 1.0, "end": 3.0}, {"start": 3.5, "end": 6.0}, {"start": 10.0, "end": 12.0}]
+    windows = schedule_windows(audio, timestamps, max_gap=1.0, padding=0.2)
+    assert windows == [
+        {"start": pytest.approx(0.8), "end": pytest.approx(6.2)},
+        {"start": pytest.approx(9.8), "end": pytest.approx(12.2)},
+    ]
+
+
+def test_schedule_respects_max_window():
+    audio = make_audio(60)
+    timestamps = [{"start": float(i), "end": i + 0.8} for i in range(60)]
+    windows = schedule_windows(audio, timestamps, max_gap=1.0, padding=0.5, max_window=10.0)
+    assert all(w["end"] - w["start"] <= 10.0 + 1e-6 for w in windows)
+    for a, b in zip(windows, windows[1:]):
+        assert a["end"] <= b["start"]
+
+
+def test_schedule_padding_is_clipped_to_audio():
+    audio = make_audio(5)
+    windows = schedule_windows(audio, [{"start": 0.1, "end": 4.9}], padding=0.5)
+    assert windows == [{"start": 0.0, "end": 5.0}]
+
+
+def test_schedule_rejects_padding_filling_window():
+    with pytest.raises(ValueError):
+        schedule_windows(make_audio(5), [{"start": 0.0, "end": 1.0}], padding=5.0, max_window=10.0)
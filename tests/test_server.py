@@ -0,0 +1,90 @@
+import pytest
+
+from src import server
+from src.server import DEFAULT_HOST, DEFAULT_PORT, JobQueue, parse_address, submit_files, validate_options
+
+
+def test_validate_options_accepts_generate_options():
+    options = {
+        "model_size": "small", "batch_size": 4, "max_gap": 1, "segment_padding": 0.2,
+        "max_window": 20.0, "coalesce": True, "stream_window": 10, "source_language": None,
+        "quantize": "int8", "formats": ["srt", "vtt"], "vad": "energy",
+    }
+    assert validate_options(options) == options
+    assert validate_options(None) == {}
+
+
+@pytest.mark.parametrize("options", [
+    [],
+    {"cache": "/tmp/cache"},
+    {"vad_model_dir": "/tmp/vad"},
+    {"output_dir": "/tmp"},
+    {"batch_size": True},
+    {"batch_size": "4"},
+    {"batch_size": 0},
+    {"max_gap": -1},
+    {"segment_padding": -0.1},
+    {"max_window": -3},
+    {"max_window": 31},
+    {"stream_window": 0},
+    {"language_samples": 0},
+    {"max_gap": float("nan")},
+    {"coalesce": True, "max_window": 2.0, "segment_padding": 1.0},
+    {"vad": "webrtc"},
+    {"quantize": "int4"},
+    {"formats": ["doc"]},
+    {"formats": [{}]},
+])
+def test_validate_options_rejects(options):
+    with pytest.raises(ValueError):
+        validate_options(options)
+
+
+def test_padding_only_matters_with_coalesce():
+    assert validate_options({"max_window": 2.0, "segment_padding": 1.0})
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("unix:/run/t.sock", ("unix", "/run/t.sock")),
+    ("/run/t.sock", ("unix", "/run/t.sock")),
+    ("t.sock", ("unix", "t.sock")),
+    ("http://10.0.0.2:9000", ("tcp", ("10.0.0.2", 9000))),
+    ("localhost:9000", ("tcp", ("localhost", 9000))),
+    ("localhost", ("tcp", ("localhost", DEFAULT_PORT))),
+    ("http://:9000", ("tcp", (DEFAULT_HOST, 9000))),
+])
+def test_parse_address(address, expected):
+    assert parse_address(address) == expected
+
+
+def test_job_overrides_win_over_client_options():
+    jobs = JobQueue(job_defaults={"offline": False, "vad": "silero"}, job_overrides={"offline": True})
+    job = jobs.submit("/media/a.mp4", options={"offline": False, "vad": "energy"})
+    assert jobs._jobs[job["id"]]["options"] == {"offline": True, "vad": "energy"}
+
+
+def test_submit_files_resubmits_after_restart(tmp_path, monkeypatch):
+    media = tmp_path / "a.mp4"
+    media.write_bytes(b"x")
+    calls = []
+    replies = iter([
+        (202, {"id": "1"}),
+        ConnectionRefusedError("daemon restarting"),
+        # The restarted daemon has never heard of job 1
+        (404, {"error": "unknown job"}),
+        (202, {"id": "2"}),
+        (200, {"status": "done", "srt": str(tmp_path / "a.srt")}),
+    ])
+
+    def fake_request(address, method, path, body=None):
+        calls.append((method, path))
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(server, "request", fake_request)
+    monkeypatch.setattr(server, "RETRY_INTERVAL", 0)
+    assert submit_files("unix:/x.sock", [media], None, {}) == [tmp_path / "a.srt"]
+    assert [c[0] for c in calls] == ["POST", "GET", "GET", "POST", "GET"]
+    assert calls[-1][1].startswith("/jobs/2?")
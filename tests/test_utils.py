@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from src.utils import (
+    JsonWriter, SrtWriter, SubtitleWriter, VttWriter, format_timestamp, open_writers, write_srt
+)
+
+SUBS = [
+    {"start": 0.0, "end": 1.5, "text": " Hello "},
+    {"start": 3661.25, "end": 3662.0, "text": "Über\n"},
+]
+
+
+def test_format_timestamp():
+    assert format_timestamp(0) == "00:00:00,000"
+    assert format_timestamp(3661.25) == "01:01:01,250"
+
+
+def test_subtitle_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        SubtitleWriter(tmp_path / "x.txt")
+
+
+def test_srt_writer(tmp_path):
+    path = tmp_path / "a.srt"
+    with SrtWriter(path) as writer:
+        for sub in SUBS:
+            writer.write(sub)
+    assert path.read_text(encoding="utf-8") == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello\n\n"
+        "2\n01:01:01,250 --> 01:01:02,000\nÜber\n\n"
+    )
+
+
+def test_vtt_writer(tmp_path):
+    path = tmp_path / "a.vtt"
+    with VttWriter(path) as writer:
+        for sub in SUBS:
+            writer.write(sub)
+    assert path.read_text(encoding="utf-8") == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\nHello\n\n"
+        "01:01:01.250 --> 01:01:02.000\nÜber\n\n"
+    )
+
+
+def test_json_writer(tmp_path):
+    path = tmp_path / "a.json"
+    with JsonWriter(path) as writer:
+        writer.write(SUBS[0])
+        # Flushed after each write: a valid prefix of the array
+        assert path.read_text(encoding="utf-8").startswith("[\n  {")
+        writer.write(SUBS[1])
+    assert json.loads(path.read_text(encoding="utf-8")) == [
+        {"start": 0.0, "end": 1.5, "text": "Hello"},
+        {"start": 3661.25, "end": 3662.0, "text": "Über"},
+    ]
+
+
+def test_json_writer_empty(tmp_path):
+    path = tmp_path / "a.json"
+    JsonWriter(path).close()
+    assert json.loads(path.read_text(encoding="utf-8")) == []
+
+
+def test_multi_writer(tmp_path):
+    with open_writers(tmp_path / "video.mp4", ["srt", "vtt", "json"]) as writer:
+        for sub in SUBS:
+            writer.write(sub)
+    assert writer.paths == [tmp_path / "video.srt", tmp_path / "video.vtt", tmp_path / "video.json"]
+    write_srt(SUBS, tmp_path / "plain.srt")
+    assert (tmp_path / "video.srt").read_text(encoding="utf-8") == (tmp_path / "plain.srt").read_text(encoding="utf-8")
+    assert (tmp_path / "video.vtt").read_text(encoding="utf-8").startswith("WEBVTT")
+    assert len(json.loads((tmp_path / "video.json").read_text(encoding="utf-8"))) == 2
+
+
+def test_open_writers_rejects_unknown_format(tmp_path):
+    with pytest.raises(KeyError):
+        open_writers(tmp_path / "video.mp4", ["srt", "doc"])